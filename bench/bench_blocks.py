@@ -0,0 +1,45 @@
+# Compares block_to_block_type against the previous regex classifier on typical and pathological blocks.
+# usage: python3 bench/bench_blocks.py [repeat]
+import os, re, sys, timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from src.texthandling import BlockType, block_to_block_type
+
+def block_to_block_type_regex(block):
+    if re.fullmatch(r"^#{1,6} .*$", block):
+        return BlockType.HEADING
+    if re.fullmatch(r"^```(.|\n)*```$", block):
+        return BlockType.CODE
+    if re.fullmatch(r"^(>.*\n)*(>.*)$", block):
+        return BlockType.QUOTE
+    if re.fullmatch(r"^(- .*\n)*(- .*)$", block):
+        return BlockType.UNORDERED_LIST
+    if re.fullmatch(r"^(\d+\. .*\n)*(\d+\. .*)$", block) and all(map(lambda iv: iv[0] == iv[1], enumerate(map(lambda l: int(l[:l.index('.')])-1, block.split('\n'))))):
+            return BlockType.ORDERED_LIST
+    return BlockType.PARAGRAPH
+
+BLOCKS = {
+    "heading": "### A heading of normal length",
+    "paragraph": "A paragraph with a few words and **some** _markup_ in it. " * 5,
+    "code 10k lines": "```\n" + '\n'.join(f"line {i} of code = x + y" for i in range(10000)) + "\n```",
+    "unclosed code 10k lines": "```\n" + '\n'.join(f"line {i} of code = x + y" for i in range(10000)),
+    "quote 10k lines": '\n'.join(f"> quoted line {i}" for i in range(10000)),
+    "quote broken at end": '\n'.join(f"> quoted line {i}" for i in range(10000)) + "\nnot quoted",
+    "unordered 10k items": '\n'.join(f"- item {i}" for i in range(10000)),
+    "ordered 10k items": '\n'.join(f"{i}. item {i}" for i in range(1, 10001)),
+    "ordered out of order": '\n'.join(f"{i}. item {i}" for i in range(1, 10001)) + "\n1. again",
+}
+
+def main():
+    repeat = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    print(f"{'block':<26}{'chars':>9}{'regex us':>12}{'dispatch us':>13}{'speedup':>10}")
+    for name, block in BLOCKS.items():
+        assert block_to_block_type(block) == block_to_block_type_regex(block), name
+        number = 10
+        old = min(timeit.repeat(lambda: block_to_block_type_regex(block), number=number, repeat=repeat)) / number
+        new = min(timeit.repeat(lambda: block_to_block_type(block), number=number, repeat=repeat)) / number
+        print(f"{name:<26}{len(block):>9}{old*1e6:>12.1f}{new*1e6:>13.1f}{old/new:>9.1f}x")
+
+if __name__ == "__main__":
+    main()
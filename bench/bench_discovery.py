@@ -0,0 +1,55 @@
+# Compares content discovery with one os.scandir per directory against the old listdir + isfile/isdir walk.
+# usage: python3 bench/bench_discovery.py [files] [files per directory] [repeat]
+import os, sys, tempfile, timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from src.navigation import Navigation, scan_content
+
+# find_pages before the content tree, one stat per entry
+def listdir_find_pages(dir_path_content, dest_dir_path):
+    pages = []
+    for entry in os.listdir(dir_path_content):
+        entry_path = os.path.join(dir_path_content, entry)
+        if os.path.isfile(entry_path) and entry.endswith(".md"):
+            pages.append((entry_path, os.path.join(dest_dir_path, entry.replace('.md', '.html'))))
+        elif os.path.isdir(entry_path):
+            pages.extend(listdir_find_pages(entry_path, os.path.join(dest_dir_path, entry)))
+    return pages
+
+# files spread over a two level tree, with an index page and an image next to every few pages
+def make_tree(root, files, per_dir):
+    for i in range(files):
+        dir_path = os.path.join(root, f"section{i // (per_dir * 10)}", f"dir{i // per_dir}")
+        if i % per_dir == 0:
+            os.makedirs(dir_path)
+            open(os.path.join(dir_path, "index.md"), 'w').close()
+        name = f"page{i}.md" if i % 5 else f"image{i}.png"
+        open(os.path.join(dir_path, name), 'w').close()
+
+def main():
+    files = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    per_dir = int(sys.argv[2]) if len(sys.argv) > 2 else 100
+    repeat = int(sys.argv[3]) if len(sys.argv) > 3 else 5
+    with tempfile.TemporaryDirectory() as tmp:
+        content = os.path.join(tmp, "content")
+        make_tree(content, files, per_dir)
+        old_pages = listdir_find_pages(content, "docs")
+        new_pages = scan_content(content, "docs").all_pages()
+        assert sorted(old_pages) == sorted(new_pages)
+        # the page cache is warm for both, this measures the syscalls and python work
+        old = min(timeit.repeat(lambda: listdir_find_pages(content, "docs"), number=1, repeat=repeat))
+        new = min(timeit.repeat(lambda: scan_content(content, "docs").all_pages(), number=1, repeat=repeat))
+        def navigate():
+            root = scan_content(content, "docs")
+            navigation = Navigation(root)
+            for _, dest_path in root.all_pages():
+                navigation.slots(dest_path)
+        nav = min(timeit.repeat(navigate, number=1, repeat=repeat))
+    print(f"{len(new_pages)} pages in {files} files, {per_dir} per directory")
+    print(f"listdir + isfile/isdir walk  {old * 1000:>9.1f} ms")
+    print(f"scandir content tree         {new * 1000:>9.1f} ms  {old / new:.2f}x")
+    print(f"tree + every page's slots    {nav * 1000:>9.1f} ms")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+# Compares escaped html serialization against the old unescaped LeafNode/props_to_html path.
+# usage: python3 bench/bench_escape.py [pages] [repeat]
+import os, random, sys, timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, os.path.dirname(__file__))
+
+from corpus import page
+from src.htmlnode import LeafNode, markdown_to_html_node
+
+# the serialization LeafNode had before values and props were escaped
+class UnescapedLeafNode(LeafNode):
+    __slots__ = ()
+
+    def props_to_html(self):
+        if self.props == None:
+            return ""
+        return ' '.join(list(map(lambda kv: f"{kv[0]}=\"{kv[1]}\"", self.props.items())))
+
+    def to_html(self):
+        if self.value == None:
+            raise ValueError("all leaf nodes must have a value")
+        if self.tag == None:
+            return self.value
+        props = ""
+        if self.props != None:
+            props = f" {self.props_to_html()}"
+        return f"<{self.tag}{props}>{self.value}</{self.tag}>"
+
+def make_unescaped(tree):
+    stack = [tree]
+    while len(stack) > 0:
+        node = stack.pop()
+        if node.children != None:
+            stack.extend(node.children)
+        elif isinstance(node, LeafNode):
+            node.__class__ = UnescapedLeafNode
+
+def corpora(pages):
+    rng = random.Random(0)
+    markdowns = {shape: [page(shape, i, rng) for i in range(pages)] for shape in ["mixed", "links", "code"]}
+    # every text node and most urls need escaping
+    markdowns["escapes"] = [md.replace(" and ", " & ").replace("compute(", "compute(<").replace("/docs/", "/docs?a=1&b=") for md in markdowns["mixed"]]
+    return markdowns
+
+def main():
+    pages = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    repeat = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    print(f"{'corpus':<12}{'MB':>8}{'unescaped MB/s':>16}{'escaped MB/s':>14}{'ratio':>8}")
+    for name, markdowns in corpora(pages).items():
+        escaped_trees = [markdown_to_html_node(md) for md in markdowns]
+        unescaped_trees = [markdown_to_html_node(md) for md in markdowns]
+        for tree in unescaped_trees:
+            make_unescaped(tree)
+        size = sum(map(lambda tree: len(tree.to_html()), escaped_trees)) / 2**20
+        old = min(timeit.repeat(lambda: [tree.to_html() for tree in unescaped_trees], number=1, repeat=repeat))
+        new = min(timeit.repeat(lambda: [tree.to_html() for tree in escaped_trees], number=1, repeat=repeat))
+        print(f"{name:<12}{size:>8.2f}{size/old:>16.2f}{size/new:>14.2f}{old/new:>7.2f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,35 @@
+# Compares the single pass text_to_textnodes against the old five pass split pipeline.
+# usage: python3 bench/bench_inline.py [repeat]
+import os, sys, timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from src.textnode import TextNode, TextType, text_to_textnodes, split_nodes_delimiter, split_nodes_link, split_nodes_image
+
+def text_to_textnodes_multipass(text):
+    nodes = [TextNode(text, TextType.TEXT)]
+    nodes = split_nodes_delimiter(nodes, "**", TextType.BOLD)
+    nodes = split_nodes_delimiter(nodes, "_", TextType.ITALIC)
+    nodes = split_nodes_delimiter(nodes, "`", TextType.CODE)
+    nodes = split_nodes_link(nodes)
+    nodes = split_nodes_image(nodes)
+    return nodes
+
+def paragraphs(size):
+    return {
+        f"plain x{size}": "just some plain words without any markup at all " * size,
+        f"link_dense x{size}": ' '.join(f"see [page {i}](/docs/page{i}) or ![figure {i}](/images/fig{i}.png)" for i in range(size)),
+        f"emphasis_dense x{size}": ' '.join(f"**bold {i}** and _italic {i}_ with `code {i}`" for i in range(size)),
+    }
+
+def main():
+    repeat = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    print(f"{'paragraph':<24}{'chars':>8}{'multipass ms':>15}{'single pass ms':>17}{'speedup':>10}")
+    for name, text in {**paragraphs(500), **paragraphs(5000)}.items():
+        number = 5
+        old = min(timeit.repeat(lambda: text_to_textnodes_multipass(text), number=number, repeat=repeat)) / number
+        new = min(timeit.repeat(lambda: text_to_textnodes(text), number=number, repeat=repeat)) / number
+        print(f"{name:<24}{len(text):>8}{old*1000:>15.3f}{new*1000:>17.3f}{old/new:>9.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+# Reports bytes per node and the peak memory of parsing and rendering a representative page set.
+# usage: python3 bench/bench_memory.py [pages] [--json report.json]
+import json, os, resource, sys, tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from src.htmlnode import LeafNode, ParentNode, markdown_to_html_node
+from src.textnode import TextNode, TextType
+
+def sample_page(i):
+    return '\n\n'.join([
+        f"# Page {i}",
+        f"Intro with **bold**, _italic_, `code` and a [link](/docs/{i}) plus ![an image](/images/{i}.png).",
+        '\n'.join(f"- item {j} with _emphasis_ and [a link](/item/{j})" for j in range(20)),
+        '\n'.join(f"{j}. step {j} uses `cmd {j}`" for j in range(1, 11)),
+        "> a quote\n> over two lines",
+        "```\n" + '\n'.join(f"line {j} of code" for j in range(30)) + "\n```",
+        ' '.join(f"Sentence {j} with **some** words and a [reference](/ref/{j})." for j in range(40)),
+    ])
+
+def bytes_per_node(factory, count = 100000):
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    nodes = [factory(i) for i in range(count)]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    # the list holding the nodes costs one pointer per node
+    return (after - before) / len(nodes) - 8
+
+def count_nodes(node):
+    count = 0
+    stack = [node]
+    while len(stack) > 0:
+        node = stack.pop()
+        count += 1
+        if node.children != None:
+            stack.extend(node.children)
+    return count
+
+def page_set_memory(pages):
+    tracemalloc.start()
+    trees = [markdown_to_html_node(sample_page(i)) for i in range(pages)]
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    nodes = sum(map(count_nodes, trees))
+    return nodes, current, peak
+
+def main():
+    args = sys.argv[1:]
+    report_path = None
+    if "--json" in args:
+        index = args.index("--json")
+        report_path = args[index + 1]
+        del args[index:index + 2]
+    pages = int(args[0]) if len(args) > 0 else 200
+    # shared strings so only the node objects themselves are measured
+    text = "text"
+    report = {
+        "bytes_per_node": {
+            "TextNode": bytes_per_node(lambda i: TextNode(text, TextType.TEXT)),
+            "LeafNode": bytes_per_node(lambda i: LeafNode("b", text)),
+            "ParentNode": bytes_per_node(lambda i: ParentNode("p", None)),
+        },
+    }
+    nodes, current, peak = page_set_memory(pages)
+    report["page_set"] = {
+        "pages": pages,
+        "html_nodes": nodes,
+        "retained_bytes_per_html_node": current / nodes,
+        "traced_peak_bytes": peak,
+        "peak_rss_bytes": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024,
+    }
+    for name, size in report["bytes_per_node"].items():
+        print(f"{name:<12}{size:>8.1f} bytes/node")
+    page_set = report["page_set"]
+    print(f"{pages} pages, {nodes} html nodes, {page_set['retained_bytes_per_html_node']:.1f} retained bytes/node")
+    print(f"traced peak {page_set['traced_peak_bytes'] / 2**20:.1f} MiB, peak RSS {page_set['peak_rss_bytes'] / 2**20:.1f} MiB")
+    if report_path != None:
+        with open(report_path, 'w') as report_file:
+            json.dump(report, report_file, indent=2)
+
+if __name__ == "__main__":
+    main()
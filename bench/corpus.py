@@ -0,0 +1,83 @@
+# Generates synthetic content/ trees for benchmarks.
+# usage: python3 bench/corpus.py DEST [pages] [shape]
+import os, random, sys
+
+SHAPES = ["mixed", "deep", "links", "code", "lists"]
+
+def words(rng, count):
+    return ' '.join(rng.choice(["lorem", "ipsum", "dolor", "sit", "amet", "elf", "ring", "river", "build", "page"]) for _ in range(count))
+
+def paragraph(rng, sentences = 5):
+    parts = []
+    for i in range(sentences):
+        match rng.randrange(5):
+            case 0:
+                parts.append(f"{words(rng, 6)} **{words(rng, 2)}** {words(rng, 4)}.")
+            case 1:
+                parts.append(f"{words(rng, 5)} _{words(rng, 2)}_ and `{words(rng, 1)}`.")
+            case 2:
+                parts.append(f"{words(rng, 4)} [{words(rng, 2)}](/docs/{rng.randrange(1000)}) {words(rng, 3)}.")
+            case _:
+                parts.append(f"{words(rng, 10)}.")
+    return ' '.join(parts)
+
+def link_paragraph(rng, links = 60):
+    return ' '.join(f"see [{words(rng, 2)}](/docs/{rng.randrange(10000)}) or ![{words(rng, 1)}](/images/{rng.randrange(100)}.png)" for _ in range(links))
+
+def code_block(rng, lines = 400):
+    return "```\n" + '\n'.join(f"    value_{i} = compute({i}, \"{words(rng, 2)}\") # {words(rng, 3)}" for i in range(lines)) + "\n```"
+
+def unordered_list(rng, items = 200):
+    return '\n'.join(f"- {words(rng, 4)} with _{words(rng, 1)}_ and [a link](/item/{i})" for i in range(items))
+
+def ordered_list(rng, items = 200):
+    return '\n'.join(f"{i}. {words(rng, 5)} `{words(rng, 1)}`" for i in range(1, items + 1))
+
+def page(shape, index, rng):
+    blocks = [f"# Page {index} {words(rng, 3)}"]
+    match shape:
+        case "links":
+            blocks += [link_paragraph(rng) for _ in range(5)]
+        case "code":
+            blocks += [paragraph(rng, 2), code_block(rng), paragraph(rng, 2), code_block(rng)]
+        case "lists":
+            blocks += [unordered_list(rng), ordered_list(rng), unordered_list(rng)]
+        case _:
+            for i in range(12):
+                match i % 6:
+                    case 0:
+                        blocks.append(f"## {words(rng, 4)}")
+                    case 1:
+                        blocks.append(f"> {words(rng, 8)}\n> {words(rng, 8)}")
+                    case 2:
+                        blocks.append(unordered_list(rng, 8))
+                    case 3:
+                        blocks.append(code_block(rng, 12))
+                    case _:
+                        blocks.append(paragraph(rng))
+    return '\n\n'.join(blocks) + '\n'
+
+# Writes `pages` markdown files under content_dir and returns their paths. "deep" nests every
+# page `depth` directories down, the other shapes spread pages over a few sections.
+def generate_corpus(content_dir, pages, shape = "mixed", seed = 0, depth = 12):
+    if shape not in SHAPES:
+        raise ValueError(f"unknown corpus shape {shape}, expected one of {', '.join(SHAPES)}")
+    rng = random.Random(seed)
+    paths = []
+    for index in range(pages):
+        if shape == "deep":
+            dir_path = os.path.join(content_dir, *(f"level{level}_{index % (level + 2)}" for level in range(depth)))
+        else:
+            dir_path = os.path.join(content_dir, f"section{index % 10}")
+        path = os.path.join(dir_path, f"page{index}.md")
+        os.makedirs(dir_path, exist_ok=True)
+        with open(path, 'w') as page_file:
+            page_file.write(page(shape, index, rng))
+        paths.append(path)
+    return paths
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        sys.exit("usage: python3 bench/corpus.py DEST [pages] [shape]")
+    paths = generate_corpus(sys.argv[1], int(sys.argv[2]) if len(sys.argv) > 2 else 100, sys.argv[3] if len(sys.argv) > 3 else "mixed")
+    print(f"Wrote {len(paths)} pages to {sys.argv[1]}")
@@ -0,0 +1,109 @@
+# Times each pipeline stage on a synthetic corpus and compares the results against a saved baseline.
+# usage: python3 bench/run.py [--pages N] [--shape SHAPE] [--baseline PATH] [--save-baseline PATH] [--threshold 0.1]
+# Exits with status 1 when a stage's throughput drops by more than the threshold.
+import argparse, json, os, sys, tempfile, time
+from contextlib import redirect_stdout
+from io import StringIO
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, os.path.dirname(__file__))
+
+from corpus import SHAPES, generate_corpus
+from src.htmlnode import markdown_to_html_node
+from src.textnode import text_to_textnodes
+from src.texthandling import BlockType, block_to_block_type, markdown_to_blocks
+from src import main as site
+
+TEMPLATE = '<!doctype html>\n<html><head><title>{{ Title }}</title><link href="/index.css" rel="stylesheet" /></head>\n<body><article>{{ Content }}</article></body></html>'
+
+def best_of(repeat, func):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best == None else min(best, elapsed)
+    return best
+
+def full_build(site_dir, args):
+    cwd = os.getcwd()
+    os.chdir(site_dir)
+    try:
+        with redirect_stdout(StringIO()):
+            site.main(args)
+    finally:
+        os.chdir(cwd)
+
+def run(pages, shape, repeat, jobs):
+    results = {}
+    with tempfile.TemporaryDirectory() as site_dir:
+        paths = generate_corpus(os.path.join(site_dir, "content"), pages, shape)
+        os.makedirs(os.path.join(site_dir, "static"))
+        os.makedirs(os.path.join(site_dir, "docs"))
+        with open(os.path.join(site_dir, "static", "index.css"), 'w') as css_file:
+            css_file.write("body {}")
+        with open(os.path.join(site_dir, "template.html"), 'w') as template_file:
+            template_file.write(TEMPLATE)
+        markdowns = []
+        for path in paths:
+            with open(path) as markdown_file:
+                markdowns.append(markdown_file.read())
+        size = sum(map(lambda md: len(md.encode()), markdowns))
+        # code blocks never go through the inline tokenizer
+        blocks = [block for md in markdowns for block in markdown_to_blocks(md) if block_to_block_type(block) != BlockType.CODE]
+        trees = [markdown_to_html_node(md) for md in markdowns]
+        stages = {
+            "markdown_to_html_node": lambda: [markdown_to_html_node(md) for md in markdowns],
+            "text_to_textnodes": lambda: [text_to_textnodes(block) for block in blocks],
+            "to_html": lambda: [tree.to_html() for tree in trees],
+            "build": lambda: full_build(site_dir, ["--jobs", str(jobs)]),
+        }
+        for stage, func in stages.items():
+            seconds = best_of(repeat, func)
+            results[stage] = {"seconds": seconds, "mb_per_s": size / 2**20 / seconds, "pages_per_s": len(markdowns) / seconds}
+    return {"pages": pages, "shape": shape, "bytes": size, "stages": results}
+
+def compare(report, baseline, threshold):
+    regressions = []
+    if (baseline.get("pages"), baseline.get("shape")) != (report["pages"], report["shape"]):
+        print(f"warning: baseline was measured on {baseline.get('pages')} {baseline.get('shape')} pages")
+    for stage, result in report["stages"].items():
+        if stage not in baseline.get("stages", {}):
+            continue
+        before = baseline["stages"][stage]["mb_per_s"]
+        change = result["mb_per_s"] / before - 1
+        flag = ""
+        if change < -threshold:
+            flag = "  REGRESSION"
+            regressions.append(stage)
+        print(f"  {stage:<24}{before:>10.2f} -> {result['mb_per_s']:>8.2f} MB/s {change * 100:>+7.1f}%{flag}")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the site generator on a synthetic corpus")
+    parser.add_argument("--pages", type=int, default=200)
+    parser.add_argument("--shape", choices=SHAPES, default="mixed")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--jobs", type=int, default=1, help="--jobs passed to the full build")
+    parser.add_argument("--baseline", metavar="PATH", help="compare against a saved report")
+    parser.add_argument("--threshold", type=float, default=0.10, help="allowed throughput drop before a stage counts as a regression")
+    parser.add_argument("--save-baseline", metavar="PATH", help="write this run's report to PATH")
+    args = parser.parse_args()
+    report = run(args.pages, args.shape, args.repeat, args.jobs)
+    print(f"{report['pages']} {report['shape']} pages, {report['bytes'] / 2**20:.2f} MB of markdown")
+    for stage, result in report["stages"].items():
+        print(f"  {stage:<24}{result['seconds'] * 1000:>10.1f} ms{result['mb_per_s']:>10.2f} MB/s{result['pages_per_s']:>10.1f} pages/s")
+    if args.save_baseline != None:
+        with open(args.save_baseline, 'w') as baseline_file:
+            json.dump(report, baseline_file, indent=2)
+    if args.baseline != None:
+        with open(args.baseline) as baseline_file:
+            baseline = json.load(baseline_file)
+        print(f"Compared to {args.baseline}:")
+        regressions = compare(report, baseline, args.threshold)
+        if len(regressions) > 0:
+            print(f"{len(regressions)} stage(s) regressed by more than {args.threshold * 100:.0f}%: {', '.join(regressions)}")
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -1 +1 @@
-python3 src/main.py "/Boot.Dev-Static-Site-Generator/"
\ No newline at end of file
+python3 -m src.main "/Boot.Dev-Static-Site-Generator/"
\ No newline at end of file
@@ -0,0 +1,3 @@
+# The site generator as a package. Embedding callers import src.builder for Site, the CLI
+# runs as python3 -m src.main. Nothing is imported here, so importing a module only loads
+# what that module needs.
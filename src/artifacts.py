@@ -0,0 +1,58 @@
+import json, os
+from datetime import datetime, timezone
+from email.utils import formatdate
+from xml.sax.saxutils import escape
+
+from .linkgraph import page_url
+
+SITEMAP_FILE = "sitemap.xml"
+FEED_FILE = "feed.xml"
+PAGE_INDEX_FILE = "pages.json"
+ARTIFACT_FILES = [SITEMAP_FILE, FEED_FILE, PAGE_INDEX_FILE]
+
+def page_entries(metadata, dest_dir_path, basepath):
+    entries = []
+    for dest_path, meta in metadata.items():
+        entries.append({"url": page_url(dest_path, dest_dir_path, basepath), "title": meta["title"], "mtime": meta["mtime"], "words": meta["words"]})
+    return sorted(entries, key=lambda entry: entry["url"])
+
+def sitemap(entries, site_url):
+    lines = ['<?xml version="1.0" encoding="UTF-8"?>', '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">']
+    for entry in entries:
+        lastmod = datetime.fromtimestamp(entry["mtime"], timezone.utc).strftime("%Y-%m-%d")
+        lines.append(f"  <url><loc>{escape(site_url + entry['url'])}</loc><lastmod>{lastmod}</lastmod></url>")
+    lines.append('</urlset>')
+    return '\n'.join(lines) + '\n'
+
+def feed(entries, site_url, basepath, size):
+    home = next(filter(lambda entry: entry["url"] == basepath, entries), None)
+    title = escape(home["title"] if home != None else site_url)
+    lines = [
+        '<?xml version="1.0" encoding="UTF-8"?>',
+        '<rss version="2.0">',
+        '<channel>',
+        f"  <title>{title}</title>",
+        f"  <link>{escape(site_url + basepath)}</link>",
+        f"  <description>{title}</description>",
+    ]
+    # most recently edited first
+    for entry in sorted(entries, key=lambda entry: (-entry["mtime"], entry["url"]))[:size]:
+        url = escape(site_url + entry["url"])
+        lines.append(f"  <item><title>{escape(entry['title'])}</title><link>{url}</link><guid>{url}</guid><pubDate>{formatdate(entry['mtime'], usegmt=True)}</pubDate></item>")
+    lines += ['</channel>', '</rss>']
+    return '\n'.join(lines) + '\n'
+
+# Writes sitemap.xml, feed.xml and pages.json from the metadata the build collected,
+# so nothing has to re-read the generated html.
+def write_artifacts(metadata, dest_dir_path, site_url, basepath, feed_size = 20):
+    site_url = site_url.rstrip('/')
+    entries = page_entries(metadata, dest_dir_path, basepath)
+    artifacts = {
+        SITEMAP_FILE: sitemap(entries, site_url),
+        FEED_FILE: feed(entries, site_url, basepath, feed_size),
+        PAGE_INDEX_FILE: json.dumps(entries, indent=1) + '\n',
+    }
+    for name, text in artifacts.items():
+        with open(os.path.join(dest_dir_path, name), 'w') as artifact_file:
+            artifact_file.write(text)
+    return list(map(lambda name: os.path.join(dest_dir_path, name), artifacts))
@@ -0,0 +1,148 @@
+import hashlib, json, os, re, struct
+
+from .linkgraph import link_target
+from .manifest import hash_file
+
+# static files that get a content hashed copy, everything else keeps only its own name
+FINGERPRINTED = (".css", ".js", ".png", ".jpg", ".jpeg", ".gif", ".webp", ".avif", ".svg", ".ico", ".woff", ".woff2")
+IMAGE_TAG_PATTERN = re.compile(r"<img\b[^>]*>")
+IMAGE_SRC_PATTERN = re.compile(r'\ssrc="(/[^"]*)"')
+DIGEST_LENGTH = 10
+
+# (width, height) from the header of a png, gif or jpeg file, None for anything else or a truncated header
+def image_size(path):
+    with open(path, 'rb') as image_file:
+        header = image_file.read(24)
+        if header.startswith(b"\x89PNG\r\n\x1a\n") and header[12:16] == b"IHDR":
+            return struct.unpack(">II", header[16:24]) if len(header) == 24 else None
+        if header[:6] in (b"GIF87a", b"GIF89a"):
+            return struct.unpack("<HH", header[6:10]) if len(header) >= 10 else None
+        if header.startswith(b"\xff\xd8"):
+            image_file.seek(2)
+            return jpeg_size(image_file)
+    return None
+
+# Walks the jpeg's segments up to the frame header, seeking past the rest (exif data and
+# thumbnails can be far bigger than the header itself).
+def jpeg_size(image_file):
+    while True:
+        byte = image_file.read(1)
+        while byte != b"" and byte != b"\xff":
+            byte = image_file.read(1)
+        # markers can be padded with any number of 0xff bytes
+        while byte == b"\xff":
+            byte = image_file.read(1)
+        if byte == b"":
+            return None
+        marker = byte[0]
+        if marker == 0x01 or 0xd0 <= marker <= 0xd8:
+            continue
+        if marker in (0xd9, 0xda):
+            # end of image or start of the scan, there was no frame header before it
+            return None
+        length = image_file.read(2)
+        if len(length) != 2:
+            return None
+        # every start of frame except DHT, JPG and DAC, which share the range
+        if 0xc0 <= marker <= 0xcf and marker not in (0xc4, 0xc8, 0xcc):
+            frame = image_file.read(5)
+            if len(frame) != 5:
+                return None
+            height, width = struct.unpack(">xHH", frame)
+            return width, height
+        image_file.seek(struct.unpack(">H", length)[0] - 2, os.SEEK_CUR)
+
+# "/css/index.css", "4f2a..." -> "/css/index.4f2a....css", a query or fragment stays at the end
+def fingerprint_url(url, digest):
+    end = len(url)
+    for separator in "#?":
+        if separator in url:
+            end = min(end, url.index(separator))
+    dot = url.rindex('.', 0, end)
+    return f"{url[:dot]}.{digest[:DIGEST_LENGTH]}{url[dot:]}"
+
+# Scans static_dir for the files in FINGERPRINTED and returns target ("/images/tom.png") ->
+# [size, mtime_ns, sha256], followed by width and height once sizes have been read. Like Manifest's
+# sources, files whose size and mtime match cache_path aren't read again, the cache is rewritten
+# with what was found.
+def scan_assets(static_dir_path, cache_path = None, sizes = True):
+    cached = {}
+    if cache_path != None:
+        try:
+            with open(cache_path) as cache_file:
+                cached = json.load(cache_file)
+        except (OSError, ValueError):
+            pass
+    assets = {}
+    for dir_path, _, file_names in os.walk(static_dir_path):
+        for file_name in file_names:
+            if not file_name.lower().endswith(FINGERPRINTED):
+                continue
+            path = os.path.join(dir_path, file_name)
+            target = '/' + os.path.relpath(path, static_dir_path).replace(os.sep, '/')
+            stat = os.stat(path)
+            entry = cached.get(target)
+            if not isinstance(entry, list) or len(entry) not in (3, 5) or entry[0] != stat.st_size or entry[1] != stat.st_mtime_ns:
+                entry = [stat.st_size, stat.st_mtime_ns, hash_file(path)]
+            if sizes and len(entry) == 3:
+                entry = entry + list(image_size(path) or (None, None))
+            assets[target] = entry
+    if cache_path != None:
+        tmp_path = f"{cache_path}.tmp"
+        with open(tmp_path, 'w') as cache_file:
+            json.dump(assets, cache_file, indent=1, sort_keys=True)
+        os.replace(tmp_path, cache_path)
+    return assets
+
+# What the template needs to know about the static files while it rewrites links: the sizes to
+# add to <img> tags and, with fingerprint, the content hashed name to link to instead of a file's own.
+class AssetMap:
+    def __init__(self, static_dir_path, cache_path = None, fingerprint = True, sizes = True):
+        self.static_dir_path = static_dir_path
+        self.cache_path = cache_path
+        self.fingerprint = fingerprint
+        self.sizes = sizes
+        self.refresh()
+
+    def refresh(self):
+        self.assets = scan_assets(self.static_dir_path, self.cache_path, self.sizes)
+
+    # a digest of the given link targets' assets, a page has to be re-rendered when it changes
+    def version(self, targets):
+        digest = hashlib.sha256(f"{self.fingerprint} {self.sizes}".encode())
+        for target in sorted(self.assets.keys() & set(targets)):
+            digest.update(f"\0{target} {self.assets[target][2]}".encode())
+        return digest.hexdigest()
+
+    # the url to link to for a site internal url, without the basepath
+    def url(self, url):
+        if not self.fingerprint:
+            return url
+        entry = self.assets.get(link_target(url))
+        if entry == None:
+            return url
+        return fingerprint_url(url, entry[2])
+
+    # gives every <img> of a png, gif or jpeg in static_dir a width and height, unless it already has one
+    def add_sizes(self, html):
+        if not self.sizes or "<img" not in html:
+            return html
+        return IMAGE_TAG_PATTERN.sub(self.__add_size, html)
+
+    def __add_size(self, match):
+        tag = match[0]
+        if " width=" in tag or " height=" in tag:
+            return tag
+        src = IMAGE_SRC_PATTERN.search(tag)
+        if src == None:
+            return tag
+        entry = self.assets.get(link_target(src[1]))
+        if entry == None or entry[3] == None:
+            return tag
+        return f'{tag[:src.end()]} width="{entry[3]}" height="{entry[4]}"{tag[src.end():]}'
+
+    # (static path, output path) for every fingerprinted copy
+    def copies(self, dest_dir_path):
+        if not self.fingerprint:
+            return []
+        return [(os.path.join(self.static_dir_path, target.lstrip('/')), os.path.join(dest_dir_path, fingerprint_url(target, entry[2]).lstrip('/'))) for target, entry in sorted(self.assets.items())]
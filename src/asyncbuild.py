@@ -0,0 +1,117 @@
+import asyncio, os
+from concurrent.futures import ThreadPoolExecutor
+
+from .htmlnode import escape_text, iter_markdown_html
+from .texthandling import WordCounter, extract_title, markdown_to_blocks
+from .linkgraph import LinkCollector
+from . import profiler
+from .searchindex import TermCounter
+
+def read_source(path):
+    with open(path) as markdown_file:
+        return markdown_file.read()
+
+def write_output(dest_path, html):
+    tmp_path = f"{dest_path}.tmp"
+    try:
+        with open(tmp_path, 'w') as dest_file:
+            dest_file.write(html)
+        os.replace(tmp_path, dest_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+def make_dirs(dir_paths):
+    # sorted so parents come first and each directory is created once
+    for dir_path in sorted(dir_paths):
+        os.makedirs(dir_path, exist_ok=True)
+
+# returns the page html and its metadata
+def render_page(from_path, dest_path, markdown, template, basepath, cache = None, index = None):
+    print(f"Generating page from {from_path} to {dest_path} using {template.path}")
+    profile = profiler.active
+    if profile != None:
+        profile.start_page(from_path)
+    try:
+        title = extract_title(markdown)
+        words = WordCounter()
+        blocks = markdown_to_blocks(markdown)
+        links = LinkCollector()
+        readers = [words, links]
+        if index != None:
+            terms = TermCounter()
+            readers.append(terms)
+        html = template.render(basepath, Title=escape_text(title), Content=iter_markdown_html(blocks, cache, readers), **template.page_slots(dest_path))
+        metadata = {"source": from_path, "title": title, "mtime": os.stat(from_path).st_mtime, "words": words.count, "links": sorted(links.links)}
+        if index != None:
+            index.add(dest_path, title, terms.terms)
+            metadata["terms"] = dict(terms.terms)
+        return html, metadata
+    finally:
+        if profile != None:
+            profile.end_page()
+
+# Sources are prefetched by `readers` tasks and rendered html is handed to `writers` tasks, the file
+# I/O runs on a thread pool so it overlaps with rendering. Rendering stays on one thread of its own.
+# At most queue_depth sources and queue_depth rendered pages wait in memory at any time.
+# Pages are added to the search index from the render thread, so it never sees two at once.
+async def generate_pages_async(pages, template, basepath, readers = 8, writers = 8, queue_depth = 32, cache = None, index = None):
+    loop = asyncio.get_running_loop()
+    failures = []
+    metadata = {}
+    io_executor = ThreadPoolExecutor(readers + writers)
+    render_executor = ThreadPoolExecutor(1)
+    sources = asyncio.Queue(queue_depth)
+    outputs = asyncio.Queue(queue_depth)
+    pending = iter(pages)
+
+    async def read():
+        # the reader tasks share one iterator, the event loop never runs two of them at once
+        for from_path, dest_path in pending:
+            try:
+                markdown = await loop.run_in_executor(io_executor, read_source, from_path)
+            except Exception as e:
+                failures.append((from_path, f"{e.__class__.__name__}: {e}"))
+                continue
+            await sources.put((from_path, dest_path, markdown))
+
+    async def render():
+        while True:
+            item = await sources.get()
+            if item == None:
+                return
+            from_path, dest_path, markdown = item
+            try:
+                html, metadata[dest_path] = await loop.run_in_executor(render_executor, render_page, from_path, dest_path, markdown, template, basepath, cache, index)
+            except Exception as e:
+                failures.append((from_path, f"{e.__class__.__name__}: {e}"))
+                continue
+            await outputs.put((from_path, dest_path, html))
+
+    async def write():
+        while True:
+            item = await outputs.get()
+            if item == None:
+                return
+            from_path, dest_path, html = item
+            try:
+                await loop.run_in_executor(io_executor, write_output, dest_path, html)
+            except Exception as e:
+                failures.append((from_path, f"{e.__class__.__name__}: {e}"))
+                del metadata[dest_path]
+
+    try:
+        await loop.run_in_executor(io_executor, make_dirs, {os.path.dirname(dest_path) for _, dest_path in pages})
+        render_task = asyncio.create_task(render())
+        writer_tasks = [asyncio.create_task(write()) for _ in range(writers)]
+        await asyncio.gather(*[read() for _ in range(readers)])
+        await sources.put(None)
+        await render_task
+        for _ in writer_tasks:
+            await outputs.put(None)
+        await asyncio.gather(*writer_tasks)
+    finally:
+        io_executor.shutdown()
+        render_executor.shutdown()
+    return sorted(failures), metadata
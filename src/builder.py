@@ -0,0 +1,201 @@
+import functools, itertools, mmap, os
+from contextlib import nullcontext
+
+from .htmlnode import escape_text, iter_markdown_html
+from .linkgraph import LinkCollector
+from .navigation import Navigation, scan_content
+from . import profiler
+from .searchindex import TermCounter
+from .sync import sync_file, sync_tree
+from .template import Template
+from .texthandling import WordCounter, extract_title, iter_buffer_blocks, iter_markdown_blocks
+
+# sources at least this big are memory mapped instead of read line by line
+MMAP_THRESHOLD = 64 * 2**10
+
+# returns the page's metadata: source path, title, source mtime, word count and link targets. With an index,
+# the page's terms are added to it once the page has been written and kept in the metadata.
+def generate_page(from_path, template, dest_path, basepath, cache = None, index = None):
+    if not isinstance(template, Template):
+        template = Template.load(template)
+    print(f"Generating page from {from_path} to {dest_path} using {template.path}")
+    os.makedirs(os.path.dirname(dest_path), exist_ok=True)
+    profile = profiler.active
+    if profile != None:
+        profile.start_page(from_path)
+    # blocks are rendered and written one at a time, the page goes through a temp file
+    # so a failure never leaves a half written page behind
+    tmp_path = f"{dest_path}.tmp"
+    try:
+        with open(from_path) as markdown_file, open(tmp_path, 'w') as dest_file, map_source(markdown_file) as source:
+            if source == None:
+                first_line = markdown_file.readline()
+                lines = itertools.chain([first_line], markdown_file)
+                blocks = iter_markdown_blocks(lines if profile == None else profile.timed_iter("read", lines))
+            else:
+                first_line = source.readline().decode(markdown_file.encoding)
+                blocks = iter_buffer_blocks(source, markdown_file.encoding, timed=None if profile == None else functools.partial(profile.timed, "read"))
+            title = extract_title(first_line)
+            mtime = os.fstat(markdown_file.fileno()).st_mtime
+            if profile != None:
+                blocks = profile.timed_iter("markdown_to_blocks", blocks)
+                dest_file = profile.timed_writer(dest_file)
+            words = WordCounter()
+            links = LinkCollector()
+            readers = [words, links]
+            if index != None:
+                terms = TermCounter()
+                readers.append(terms)
+            template.write(dest_file, basepath, Title=escape_text(title), Content=iter_markdown_html(blocks, cache, readers), **template.page_slots(dest_path))
+        os.replace(tmp_path, dest_path)
+        metadata = {"source": from_path, "title": title, "mtime": mtime, "words": words.count, "links": sorted(links.links)}
+        if index != None:
+            index.add(dest_path, title, terms.terms)
+            # kept so the next incremental build can index the page without reading it again
+            metadata["terms"] = dict(terms.terms)
+        return metadata
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    finally:
+        if profile != None:
+            profile.end_page()
+
+# Maps large sources so their blocks are decoded straight from the page cache, a block at a time
+# rather than a line at a time. Sources with a '\r' anywhere, even if only some lines end in '\r\n',
+# are left to the text mode reader, which translates every line ending.
+def map_source(markdown_file):
+    if os.fstat(markdown_file.fileno()).st_size < MMAP_THRESHOLD:
+        return nullcontext()
+    source = mmap.mmap(markdown_file.fileno(), 0, access=mmap.ACCESS_READ)
+    if source.find(b"\r") != -1:
+        source.close()
+        return nullcontext()
+    return source
+
+def find_pages(dir_path_content, dest_dir_path):
+    return scan_content(dir_path_content, dest_dir_path).all_pages()
+
+def page_dest_path(from_path, dir_path_content, dest_dir_path):
+    # same mapping as find_pages
+    dir_path, entry = os.path.split(os.path.relpath(from_path, dir_path_content))
+    return os.path.join(dest_dir_path, dir_path, entry.replace('.md', '.html'))
+
+def is_within(path, dir_path):
+    return os.path.commonpath([os.path.abspath(path), os.path.abspath(dir_path)]) == os.path.abspath(dir_path)
+
+# Sorts changed and removed files into what has to happen to the output: whether the template
+# changed, the (source, dest) pages to render, the static (src, dest) files to copy and the
+# outputs to remove.
+def plan_changes(changed, removed, dir_path_content, static_dir_path, template_path, dest_dir_path):
+    template_changed = any(map(lambda path: os.path.abspath(path) == os.path.abspath(template_path), changed))
+    pages = [(path, page_dest_path(path, dir_path_content, dest_dir_path)) for path in changed if is_within(path, dir_path_content) and path.endswith(".md")]
+    copies = [(path, os.path.join(dest_dir_path, os.path.relpath(path, static_dir_path))) for path in changed if is_within(path, static_dir_path)]
+    removals = []
+    for path in removed:
+        if is_within(path, dir_path_content) and path.endswith(".md"):
+            removals.append(page_dest_path(path, dir_path_content, dest_dir_path))
+        elif is_within(path, static_dir_path):
+            removals.append(os.path.join(dest_dir_path, os.path.relpath(path, static_dir_path)))
+    return template_changed, pages, copies, removals
+
+def apply_file_changes(copies, removals, dest_dir_path):
+    for path, dest_path in copies:
+        if sync_file(path, dest_path):
+            print(f"Copied {path} to {dest_path}")
+    for dest_path in removals:
+        print(f"Removing {dest_path}")
+        remove_output(dest_path, dest_dir_path)
+
+def remove_output(dest_path, dest_dir_path):
+    try:
+        os.remove(dest_path)
+    except FileNotFoundError:
+        pass
+    # clean up directories that only held the removed page
+    dir_path = os.path.dirname(dest_path)
+    while os.path.normpath(dir_path) != os.path.normpath(dest_dir_path) and os.path.isdir(dir_path) and len(os.listdir(dir_path)) == 0:
+        os.rmdir(dir_path)
+        dir_path = os.path.dirname(dir_path)
+
+# In-process access to a site for long running callers like a preview service. The template is
+# loaded once and the content tree on the first build, or up front when the template has navigation
+# slots, and again only when a page comes or goes. render_page never walks the tree, so rendering
+# one page costs the same however big the site is.
+# Importing this module only pulls in the renderer, none of the CLI's parallel or async machinery.
+class Site:
+    def __init__(self, root_path = ".", basepath = "/", cache = None):
+        self.dir_path_content = os.path.join(root_path, "content")
+        self.static_dir_path = os.path.join(root_path, "static")
+        self.template_path = os.path.join(root_path, "template.html")
+        self.dest_dir_path = os.path.join(root_path, "docs")
+        self.basepath = basepath
+        self.cache = cache
+        self.tree = None
+        # normalized source path -> dest path, found along with the tree
+        self.pages = None
+        self.load_template()
+        # dest path -> what generate_page reported, for every page built so far
+        self.metadata = {}
+
+    # reads the content tree, the template's navigation is made from it
+    def scan(self):
+        self.tree = scan_content(self.dir_path_content, self.dest_dir_path)
+        self.pages = {os.path.normpath(from_path): dest_path for from_path, dest_path in self.tree.all_pages()}
+        if self.template.nav_slots:
+            self.template.navigation = Navigation(self.tree)
+
+    # the tree is only needed this early for a template with navigation slots
+    def load_template(self):
+        self.template = Template.load(self.template_path)
+        if self.template.nav_slots:
+            if self.tree == None:
+                self.scan()
+            else:
+                self.template.navigation = Navigation(self.tree)
+
+    # returns the html of the page for a source path relative to the content directory, without writing it
+    def render_page(self, path):
+        from_path = os.path.join(self.dir_path_content, path)
+        if self.template.navigation != None and os.path.normpath(from_path) not in self.pages:
+            # a page that's newer than the tree, it has to be in its own navigation
+            self.scan()
+        dest_path = page_dest_path(from_path, self.dir_path_content, self.dest_dir_path)
+        with open(from_path) as markdown_file:
+            first_line = markdown_file.readline()
+            blocks = iter_markdown_blocks(itertools.chain([first_line], markdown_file))
+            return self.template.render(self.basepath, Title=escape_text(extract_title(first_line)), Content=iter_markdown_html(blocks, self.cache), **self.template.page_slots(dest_path))
+
+    # Builds everything when changed_paths is None. Otherwise only acts on the given content, static and
+    # template paths, paths that no longer exist are removed from the output. Returns the metadata of
+    # the pages it rendered.
+    def build(self, changed_paths = None):
+        if changed_paths == None:
+            self.scan()
+            sync_tree(self.static_dir_path, self.dest_dir_path, self.pages.values())
+            return self.render(self.pages.items())
+        changed = [path for path in changed_paths if os.path.exists(path)]
+        removed = [path for path in changed_paths if not os.path.exists(path)]
+        if self.pages == None:
+            self.scan()
+        template_changed, pages, copies, removals = plan_changes(changed, removed, self.dir_path_content, self.static_dir_path, self.template_path, self.dest_dir_path)
+        added_or_removed = any(map(lambda path: os.path.normpath(path) in self.pages, removed)) or any(map(lambda page: os.path.normpath(page[0]) not in self.pages, pages))
+        for path in removed:
+            self.metadata.pop(self.pages.get(os.path.normpath(path)), None)
+        if template_changed:
+            self.load_template()
+        if added_or_removed:
+            self.scan()
+            # a page came or went, which changes the navigation of the others
+            template_changed = template_changed or self.template.navigation != None
+        if template_changed:
+            pages = self.pages.items()
+        metadata = self.render(pages)
+        apply_file_changes(copies, removals, self.dest_dir_path)
+        return metadata
+
+    def render(self, pages):
+        metadata = {dest_path: generate_page(from_path, self.template, dest_path, self.basepath, self.cache) for from_path, dest_path in pages}
+        self.metadata.update(metadata)
+        return metadata
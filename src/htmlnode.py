@@ -1,7 +1,23 @@
-from textnode import TextNode, TextType, text_to_textnodes
-from texthandling import BlockType, markdown_to_blocks, block_to_block_type, trim_line_leading_markdown
+from .textnode import TextNode, TextType, text_to_textnodes
+from .texthandling import BlockType, markdown_to_blocks, block_to_block_type, trim_line_leading_markdown
+
+# Most text has nothing to escape, the `in` checks skip it without building a new string. For text
+# that does, chained replaces beat str.translate, which goes through a dict lookup per character.
+def escape_text(text):
+    if '&' in text or '<' in text or '>' in text:
+        return text.replace('&', "&amp;").replace('<', "&lt;").replace('>', "&gt;")
+    return text
+
+# for values inside double quoted attributes
+def escape_attribute(value):
+    if '&' in value or '<' in value or '>' in value or '"' in value:
+        return value.replace('&', "&amp;").replace('<', "&lt;").replace('>', "&gt;").replace('"', "&quot;")
+    return value
 
 class HTMLNode:
+    # subclasses declare empty __slots__ too, otherwise every node would get a __dict__ again
+    __slots__ = ("tag", "value", "children", "props")
+
     def __init__(self, tag = None, value = None, children = None, props = None):
         self.tag = tag
         self.value = value
@@ -10,11 +26,36 @@ class HTMLNode:
 
     def to_html(self):
         raise NotImplementedError()
+
+    # Yields the html in order using an explicit stack instead of recursion, so deep trees
+    # don't hit the recursion limit and no level re-copies the html of its descendants.
+    def iter_html(self):
+        stack = [self]
+        while len(stack) > 0:
+            node = stack.pop()
+            if isinstance(node, str):
+                yield node
+            else:
+                yield node.open_html(stack)
+
+    def write_html(self, stream):
+        stream.writelines(self.iter_html())
+
+    # returns the html that opens this node and pushes whatever comes after it onto the stack
+    def open_html(self, stack):
+        return self.to_html()
     
     def props_to_html(self):
         if self.props == None:
             return ""
-        return ' '.join(list(map(lambda kv: f"{kv[0]}=\"{kv[1]}\"", self.props.items())))
+        return self.attributes_html()[1:]
+
+    # ' name="value"' for every prop, concatenated in place since there are rarely more than two
+    def attributes_html(self):
+        html = ""
+        for name, value in self.props.items():
+            html += f' {name}="{escape_attribute(value)}"'
+        return html
 
     def __repr__(self):
         string_repr = f"{self.__class__.__name__}(tag:{self.tag}, value:{self.value}, props:{self.props})"
@@ -26,19 +67,29 @@ class HTMLNode:
         return string_repr
     
 class ParentNode(HTMLNode):
+    __slots__ = ()
+
     def __init__(self, tag, children, props = None):
         super().__init__(tag, None, children, props)
     
     def to_html(self):
+        return ''.join(self.iter_html())
+
+    def open_html(self, stack):
         if self.tag == None:
             raise ValueError("all parent nodes must have a tag")
         if self.children == None or len(self.children) == 0:
             raise ValueError("all parent nodes must have at least one child")
-        children_html = ''.join(list(map(lambda c: c.to_html(), self.children)))
-        return f"<{self.tag}>{children_html}</{self.tag}>"
-        
+        stack.append(f"</{self.tag}>")
+        stack.extend(reversed(self.children))
+        if self.props != None:
+            return f"<{self.tag}{self.attributes_html()}>"
+        return f"<{self.tag}>"
+
 
 class LeafNode(HTMLNode):
+    __slots__ = ()
+
     def __init__(self, tag, value, props = None):
         super().__init__(tag, value, None, props)
     
@@ -46,11 +97,10 @@ class LeafNode(HTMLNode):
         if self.value == None:
             raise ValueError("all leaf nodes must have a value")
         if self.tag == None:
-            return self.value
-        props = ""
+            return escape_text(self.value)
         if self.props != None:
-            props = f" {self.props_to_html()}"
-        return f"<{self.tag}{props}>{self.value}</{self.tag}>"
+            return f"<{self.tag}{self.attributes_html()}>{escape_text(self.value)}</{self.tag}>"
+        return f"<{self.tag}>{escape_text(self.value)}</{self.tag}>"
     
 def text_node_to_html_node(text_node: TextNode):
     match text_node.text_type:
@@ -75,22 +125,72 @@ def text_to_children(text):
 def text_to_list_items(text):
     return list(map(lambda line: ParentNode("li", text_to_children(line)), text.split('\n')))
 
+def block_to_html_node(block):
+    match block_to_block_type(block):
+        case BlockType.PARAGRAPH:
+            return ParentNode("p", text_to_children(block))
+        case BlockType.HEADING:
+            heading_size = block.index(' ')
+            return ParentNode(f"h{heading_size}", text_to_children(block[heading_size+1:]))
+        case BlockType.CODE:
+            # remove the leading and trailing ```
+            return ParentNode("pre", [text_node_to_html_node(TextNode(block[3:-3].strip()+'\n', TextType.CODE))])
+        case BlockType.QUOTE:
+            return ParentNode("blockquote", text_to_children(trim_line_leading_markdown(block, '>')))
+        case BlockType.UNORDERED_LIST:
+            return ParentNode("ul", text_to_list_items(trim_line_leading_markdown(block, '-')))
+        case BlockType.ORDERED_LIST:
+            return ParentNode("ol", text_to_list_items(trim_line_leading_markdown(block, '.')))
+
 def markdown_to_html_node(markdown):
-    children = []
-    for block in markdown_to_blocks(markdown):
-        match block_to_block_type(block):
-            case BlockType.PARAGRAPH:
-                children.append(ParentNode("p", text_to_children(block)))
-            case BlockType.HEADING:
-                heading_size = block.index(' ')
-                children.append(ParentNode(f"h{heading_size}", text_to_children(block[heading_size+1:])))
-            case BlockType.CODE:
-                # remove the leading and trailing ```
-                children.append(ParentNode("pre", [text_node_to_html_node(TextNode(block[3:-3].strip()+'\n', TextType.CODE))]))
-            case BlockType.QUOTE:
-                children.append(ParentNode("blockquote", text_to_children(trim_line_leading_markdown(block, '>'))))
-            case BlockType.UNORDERED_LIST:
-                children.append(ParentNode("ul", text_to_list_items(trim_line_leading_markdown(block, '-'))))
-            case BlockType.ORDERED_LIST:
-                children.append(ParentNode("ol", text_to_list_items(trim_line_leading_markdown(block, '.'))))
-    return ParentNode("div", children)
\ No newline at end of file
+    return ParentNode("div", list(map(block_to_html_node, markdown_to_blocks(markdown))))
+
+# The text a rendered node shows and the urls of its links and images, read off its leaves so
+# markdown syntax is never part of it. Every element starts a new line, words never run across them.
+def rendered_text(node):
+    texts = []
+    urls = []
+    stack = [node]
+    while len(stack) > 0:
+        node = stack.pop()
+        if node.children != None:
+            texts.append('\n')
+            stack.extend(reversed(node.children))
+            continue
+        texts.append(node.value)
+        if node.props != None:
+            url = node.props.get("href", node.props.get("src"))
+            if url != None:
+                urls.append(url)
+    return ''.join(texts), urls
+
+# Streaming counterpart of markdown_to_html_node(...).to_html(). With a RenderCache, blocks
+# seen before are served from it as a single fragment instead of being rendered again.
+# Every reader's read(text, urls) gets the rendered_text of each block, cached blocks
+# keep theirs next to their html.
+def iter_markdown_html(blocks, cache = None, readers = ()):
+    empty = True
+    for block in blocks:
+        if empty:
+            yield "<div>"
+            empty = False
+        if cache == None:
+            node = block_to_html_node(block)
+            yield from node.iter_html()
+            if len(readers) != 0:
+                text, urls = rendered_text(node)
+                for reader in readers:
+                    reader.read(text, urls)
+            continue
+        key = cache.key(block)
+        entry = cache.get(key)
+        if entry == None:
+            node = block_to_html_node(block)
+            entry = [node.to_html(), *rendered_text(node)]
+            cache.put(key, entry)
+        yield entry[0]
+        for reader in readers:
+            reader.read(entry[1], entry[2])
+    if empty:
+        raise ValueError("all parent nodes must have at least one child")
+    yield "</div>"
@@ -0,0 +1,88 @@
+import os
+from urllib.parse import unquote
+
+# A reader of iter_markdown_html like WordCounter, collecting the site internal targets of every
+# link and image the page renders. Brackets in code blocks and code spans never become links.
+class LinkCollector:
+    def __init__(self):
+        self.links = set()
+
+    def read(self, text, urls):
+        for url in urls:
+            target = link_target(url)
+            if target != None:
+                self.links.add(target)
+
+# "/blog/tom#intro" -> "/blog/tom", None for urls that leave the site
+def link_target(url):
+    if not url.startswith('/') or url.startswith("//"):
+        return None
+    for separator in "#?":
+        url = url.split(separator, 1)[0]
+    return unquote(url)
+
+# "docs/blog/tom/index.html" -> "/blog/tom/", directories serve their index.html
+def page_url(dest_path, dest_dir_path, basepath):
+    path = os.path.relpath(dest_path, dest_dir_path).replace(os.sep, '/')
+    if path == "index.html":
+        path = ""
+    elif path.endswith("/index.html"):
+        path = path[:-len("index.html")]
+    return basepath + path
+
+# the files in dest_dir a target can be served from, in the order a static server tries them
+def target_paths(target, dest_dir_path):
+    path = os.path.join(dest_dir_path, target.lstrip('/'))
+    if target.endswith('/'):
+        return [os.path.join(path, "index.html")]
+    return [path, f"{path}.html", os.path.join(path, "index.html")]
+
+# every target that target_paths would resolve to dest_path
+def path_targets(dest_path, dest_dir_path):
+    path = '/' + os.path.relpath(dest_path, dest_dir_path).replace(os.sep, '/')
+    targets = {path}
+    if path.endswith(".html"):
+        targets.add(path[:-len(".html")])
+    if path.endswith("/index.html"):
+        dir_path = path[:-len("index.html")]
+        targets.update([dir_path, dir_path.rstrip('/')])
+    targets.discard("")
+    return targets
+
+# Pages -> the targets they link to, from the "links" of the build metadata. Only the pages
+# that are asked about get their links resolved, so an incremental build never checks the whole site.
+class LinkGraph:
+    def __init__(self, metadata, dest_dir_path):
+        self.dest_dir_path = dest_dir_path
+        self.links = {dest_path: meta.get("links", []) for dest_path, meta in metadata.items()}
+        self.pages = set(map(os.path.normpath, metadata))
+        self.served = {}
+
+    # targets are resolved against the pages of the build first, anything else has to be a file in dest_dir
+    def exists(self, target):
+        served = self.served.get(target)
+        if served == None:
+            paths = target_paths(target, self.dest_dir_path)
+            served = any(map(lambda path: os.path.normpath(path) in self.pages, paths)) or any(map(os.path.isfile, paths))
+            self.served[target] = served
+        return served
+
+    # the pages with a link to any of the removed outputs
+    def dependents(self, removed_paths):
+        removed_targets = set()
+        for path in removed_paths:
+            removed_targets.update(path_targets(path, self.dest_dir_path))
+        if len(removed_targets) == 0:
+            return []
+        return sorted(dest_path for dest_path, targets in self.links.items() if not removed_targets.isdisjoint(targets))
+
+    # returns (page, target) for every link that goes nowhere, only looking at the given pages
+    def broken_links(self, dest_paths = None):
+        if dest_paths == None:
+            dest_paths = self.links
+        broken = []
+        for dest_path in sorted(dest_paths):
+            for target in self.links.get(dest_path, []):
+                if not self.exists(target):
+                    broken.append((dest_path, target))
+        return broken
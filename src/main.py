@@ -1,39 +1,302 @@
-import shutil, os, sys
-
-from htmlnode import markdown_to_html_node
-from texthandling import extract_title
-
-def main():
-    basepath = "/" if len(sys.argv) < 2 else sys.argv[1]
-    copy_static_to_public()
-    generate_pages_recursive("./content", "./template.html", "./docs", basepath)
-
-def copy_static_to_public():
-    shutil.rmtree('./docs')
-    shutil.copytree('./static', './docs')
-
-def generate_page(from_path, template_path, dest_path, basepath):
-    print(f"Generating page from {from_path} to {dest_path} using {template_path}")
-    markdown = ""
-    with open(from_path) as markdown_file:
-        markdown = markdown_file.read()
-    template = ""
-    with open(template_path) as template_file:
-        template = template_file.read()
-    node = markdown_to_html_node(markdown)
-    html_string = node.to_html()
-    title = extract_title(markdown)
-    full_html = template.replace('{{ Title }}', title).replace('{{ Content }}', html_string).replace('href="/', f'href="{basepath}').replace('src="/', f'src="{basepath}')
-    os.makedirs(os.path.dirname(dest_path), exist_ok=True)
-    with open(dest_path, 'w') as dest_file:
-        dest_file.write(full_html)
-
-def generate_pages_recursive(dir_path_content: str, template_path, dest_dir_path, basepath):
-    for entry in os.listdir(dir_path_content):
-        entry_path = os.path.join(dir_path_content, entry)
-        if os.path.isfile(entry_path) and entry.endswith(".md"):
-            generate_page(entry_path, template_path, os.path.join(dest_dir_path, entry.replace('.md', '.html')), basepath)
-        elif os.path.isdir(entry_path):
-            generate_pages_recursive(entry_path, template_path, os.path.join(dest_dir_path, entry), basepath)
-
-main()
\ No newline at end of file
+import argparse, asyncio, os, sys
+from concurrent.futures import ProcessPoolExecutor
+
+from .artifacts import ARTIFACT_FILES, write_artifacts
+from .assets import AssetMap
+from .asyncbuild import generate_pages_async
+from .builder import apply_file_changes, find_pages, generate_page, is_within, plan_changes, remove_output
+from .manifest import Manifest
+from .linkgraph import LinkGraph
+from .navigation import Navigation, scan_content
+from .precompress import COMPRESSED_SUFFIX, precompress
+from . import profiler
+from .rendercache import RenderCache
+from .server import serve
+from .searchindex import PendingTerms, SearchIndexWriter, index_files
+from .shards import SHARD_MANIFEST, merge_shards, parse_shard, shard_pages, write_shard_manifest
+from .sync import sync_file, sync_tree
+from .template import Template
+from .watch import watch
+
+MANIFEST_PATH = "./.build-manifest.json"
+COMPRESS_MANIFEST_PATH = "./.compress-manifest.json"
+ASSET_CACHE_PATH = "./.asset-cache.json"
+
+class BuildError(Exception):
+    def __init__(self, failures):
+        self.failures = failures
+        details = '\n'.join(map(lambda f: f"  {f[0]}: {f[1]}", failures))
+        super().__init__(f"failed to generate {len(failures)} page(s):\n{details}")
+
+def main(argv = None):
+    if argv == None:
+        argv = sys.argv[1:]
+    if len(argv) > 0 and argv[0] == "merge":
+        return merge(parse_merge_args(argv[1:]))
+    if len(argv) > 0 and argv[0] == "serve":
+        args = parse_serve_args(argv[1:])
+        return serve(args.port, ".", args.basepath, args.cache_size * 2**20)
+    args = parse_args(argv)
+    if args.profile:
+        profiler.enable()
+    cache = load_render_cache(args.cache_size, args.cache_file)
+    # one pass over the content tree finds the pages and feeds the navigation slots, shards still see all of it
+    tree = scan_content("./content", "./docs")
+    pages = tree.all_pages()
+    if args.shard != None:
+        pages = shard_pages(pages, "./content", *args.shard)
+    outputs = list(map(lambda page: page[1], pages))
+    if args.shard != None:
+        outputs.append(os.path.join("./docs", SHARD_MANIFEST))
+    if args.site_url != None:
+        outputs += map(lambda name: os.path.join("./docs", name), ARTIFACT_FILES)
+    if args.search_index:
+        # the index writer removes whatever it doesn't rewrite itself
+        outputs += index_files("./docs")
+    assets = None
+    if args.fingerprint or args.image_sizes:
+        assets = AssetMap("./static", ASSET_CACHE_PATH, args.fingerprint, args.image_sizes)
+        outputs += map(lambda copy: copy[1], assets.copies("./docs"))
+    removed_static = copy_static_to_public(outputs, args.hash_static, args.gzip)
+    if assets != None:
+        copy_fingerprinted(assets, "./docs")
+    index = SearchIndexWriter("./docs", args.basepath) if args.search_index else None
+    template = Template.load("./template.html", args.minify, assets, Navigation(tree))
+    if args.incremental:
+        to_render, removed, metadata = generate_pages_incremental(pages, template, "./docs", args.basepath, MANIFEST_PATH, args.jobs, cache, args.io_workers, args.queue_depth, index)
+    else:
+        metadata = generate_pages(pages, template, args.basepath, args.jobs, cache, args.io_workers, args.queue_depth, index)
+    if args.shard != None:
+        # links into other shards can only be checked once the shards are merged
+        write_shard_manifest("./docs", *args.shard, args.basepath, metadata)
+    elif args.incremental:
+        # only re-rendered pages and the pages linking to whatever disappeared can have new broken links
+        check_links(metadata, "./docs", map(lambda page: page[1], to_render), removed + removed_static)
+    else:
+        check_links(metadata, "./docs")
+    if index != None:
+        print(f"Indexed {index.doc_count} pages into {len(index.close())} search index files")
+    if args.site_url != None:
+        write_artifacts(metadata, "./docs", args.site_url, args.basepath, args.feed_size)
+    if args.gzip:
+        # compression runs on threads, --jobs only sizes the process pool
+        precompress("./docs", COMPRESS_MANIFEST_PATH)
+    if cache != None:
+        print(cache.stats())
+        if cache.path != None:
+            cache.save()
+    if args.profile:
+        print(profiler.active.report(args.profile_top))
+        if args.profile_json != None:
+            profiler.active.save(args.profile_json)
+    if args.watch:
+        watch(["./content", "./static", "./template.html"], lambda changed, removed: rebuild_changed(changed, removed, "./content", "./static", "./template.html", "./docs", args.basepath, args.jobs, cache, args.minify, assets, args.gzip))
+
+def parse_args(argv = None):
+    parser = argparse.ArgumentParser(description="Generate the site in ./docs from ./content, ./static and ./template.html")
+    parser.add_argument("basepath", nargs="?", default="/")
+    parser.add_argument("--incremental", action="store_true", help="only re-render pages whose source, template or basepath changed since the last build")
+    parser.add_argument("-j", "--jobs", type=int, default=1, metavar="N", help="render pages across N worker processes (0 = one per CPU)")
+    parser.add_argument("--io-workers", type=int, default=0, metavar="N", help="overlap file I/O with rendering using N async readers and N writers (single process builds only)")
+    parser.add_argument("--queue-depth", type=int, default=32, metavar="N", help="with --io-workers, most pages read ahead or waiting to be written at once")
+    parser.add_argument("--shard", type=shard_arg, metavar="i/N", help="only render the pages that hash to shard i of N, combine the shards with the merge subcommand")
+    parser.add_argument("--site-url", metavar="URL", help="public url of the site, e.g. https://example.com, enables sitemap.xml, feed.xml and pages.json")
+    parser.add_argument("--feed-size", type=int, default=20, metavar="N", help="number of most recently edited pages in feed.xml")
+    parser.add_argument("--search-index", action="store_true", help="build a sharded search index of every page in ./docs/search")
+    parser.add_argument("--minify", action="store_true", help="collapse whitespace and drop comments in the generated html, <pre>, <textarea>, <script> and <style> are left alone")
+    parser.add_argument("--gzip", action="store_true", help="write a .gz next to every html, css, js, json, xml, svg and txt file in ./docs for servers that send precompressed files")
+    parser.add_argument("--image-sizes", action="store_true", help="give <img> tags of png, jpeg and gif files in ./static their width and height")
+    parser.add_argument("--fingerprint", action="store_true", help="also copy css, js, images and fonts from ./static under content hashed names like index.0123abcdef.css and link to those")
+    parser.add_argument("--hash-static", action="store_true", help="compare static files by content hash when size matches but mtime differs")
+    parser.add_argument("--cache-size", type=int, default=0, metavar="MB", help="cache rendered html of repeated blocks, using up to MB megabytes (0 = off)")
+    parser.add_argument("--cache-file", metavar="PATH", help="keep the render cache in PATH between builds (64MB unless --cache-size is given)")
+    parser.add_argument("--profile", action="store_true", help="time every pipeline stage per page and print a report")
+    parser.add_argument("--profile-top", type=int, default=10, metavar="N", help="number of slowest pages to list in the profile report")
+    parser.add_argument("--profile-json", metavar="PATH", help="also write the profile report to PATH as json")
+    parser.add_argument("--watch", action="store_true", help="after building, poll content, static and the template and rebuild only what changed")
+    args = parser.parse_args(argv)
+    if args.shard != None and (args.site_url != None or args.search_index or args.watch):
+        parser.error("--site-url, --search-index and --watch need every page, pass the first two to merge instead of the shards")
+    return args
+
+def shard_arg(text):
+    try:
+        return parse_shard(text)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
+
+def parse_merge_args(argv):
+    parser = argparse.ArgumentParser(prog="main.py merge", description="Combine the ./docs outputs of --shard builds into one site")
+    parser.add_argument("shards", nargs="+", metavar="SHARD_DIR", help="the output directory of every shard")
+    parser.add_argument("--out", default="./docs", metavar="DIR", help="directory to merge the shards into")
+    parser.add_argument("--site-url", metavar="URL", help="public url of the site, enables sitemap.xml, feed.xml and pages.json")
+    parser.add_argument("--feed-size", type=int, default=20, metavar="N", help="number of most recently edited pages in feed.xml")
+    parser.add_argument("--search-index", action="store_true", help="build the search index of the merged site, its sources have to be in ./content")
+    parser.add_argument("--gzip", action="store_true", help="write a .gz next to every compressible file of the merged site")
+    return parser.parse_args(argv)
+
+def parse_serve_args(argv):
+    parser = argparse.ArgumentParser(prog="main.py serve", description="Serve the site, rendering each page from ./content when it is requested")
+    parser.add_argument("basepath", nargs="?", default="/")
+    parser.add_argument("--port", type=int, default=8888)
+    parser.add_argument("--cache-size", type=int, default=64, metavar="MB", help="memory for rendered pages, least recently requested pages are dropped first")
+    return parser.parse_args(argv)
+
+def merge(args):
+    try:
+        basepath, metadata = merge_shards(args.shards, args.out)
+    except ValueError as e:
+        sys.exit(f"merge failed: {e}")
+    check_links(metadata, args.out)
+    if args.search_index:
+        index = SearchIndexWriter(args.out, basepath)
+        for dest_path, meta in sorted(metadata.items()):
+            index.add_page(dest_path, meta)
+        print(f"Indexed {index.doc_count} pages into {len(index.close())} search index files")
+    if args.site_url != None:
+        write_artifacts(metadata, args.out, args.site_url, basepath, args.feed_size)
+    if args.gzip:
+        precompress(args.out, COMPRESS_MANIFEST_PATH)
+
+def load_render_cache(size_mb, path):
+    if size_mb == 0 and path == None:
+        return None
+    max_bytes = (size_mb or 64) * 2**20
+    if path != None:
+        return RenderCache.load(path, max_bytes)
+    return RenderCache(max_bytes)
+
+# returns the outputs that were removed because their static file is gone
+def copy_static_to_public(page_paths = (), use_hash = False, keep_compressed = False):
+    # only new or changed files are copied, the pages about to be generated are left in place
+    # and so are the .gz files of anything that stays
+    siblings = (COMPRESSED_SUFFIX,) if keep_compressed else ()
+    copied, removed = sync_tree('./static', './docs', page_paths, use_hash, siblings=siblings)
+    print(f"Synced ./static to ./docs: {len(copied)} copied, {len(removed)} removed")
+    return removed
+
+def copy_fingerprinted(assets, dest_dir_path):
+    copied = sum(map(lambda copy: sync_file(*copy), assets.copies(dest_dir_path)))
+    print(f"Fingerprinted {len(assets.assets)} static files, {copied} copied")
+
+# Prints and returns the broken links of the changed pages and of every page linking to a removed
+# output, or of every page when changed is None.
+def check_links(metadata, dest_dir_path, changed = None, removed = ()):
+    graph = LinkGraph(metadata, dest_dir_path)
+    if changed != None:
+        changed = set(changed).union(graph.dependents(removed))
+    broken = graph.broken_links(changed)
+    for dest_path, target in broken:
+        print(f"Broken link in {dest_path}: {target}")
+    return broken
+
+# returns dest path -> metadata for every generated page
+def generate_pages(pages, template, basepath, jobs = 1, cache = None, io_workers = 0, queue_depth = 32, index = None):
+    if jobs == 0:
+        jobs = os.cpu_count() or 1
+    if io_workers > 0 and jobs <= 1:
+        failures, metadata = asyncio.run(generate_pages_async(pages, template, basepath, io_workers, io_workers, queue_depth, cache, index))
+        if len(failures) > 0:
+            raise BuildError(failures)
+        return metadata
+    if jobs <= 1 or len(pages) <= 1:
+        return {dest_path: generate_page(from_path, template, dest_path, basepath, cache, index) for from_path, dest_path in pages}
+    # hand out a few batches per worker so the pool stays busy without paying per-page IPC
+    batch_size = max(1, len(pages) // (jobs * 4))
+    batches = [pages[i:i+batch_size] for i in range(0, len(pages), batch_size)]
+    failures = []
+    metadata = {}
+    profile = profiler.active != None
+    # every worker starts from its own copy of the cache and reports back what it added
+    with ProcessPoolExecutor(max_workers=jobs, initializer=set_worker_cache, initargs=(cache,)) as executor:
+        for result in executor.map(generate_page_batch, batches, [template] * len(batches), [basepath] * len(batches), [profile] * len(batches), [index != None] * len(batches)):
+            failures.extend(result["failures"])
+            metadata.update(result["metadata"])
+            if index != None:
+                for dest_path, meta in result["metadata"].items():
+                    index.add_page(dest_path, meta)
+            if profile:
+                profiler.active.merge(result["timings"])
+            if cache != None:
+                cache.merge(*result["cache"])
+    if len(failures) > 0:
+        raise BuildError(failures)
+    return metadata
+
+worker_cache = None
+
+def set_worker_cache(cache):
+    global worker_cache
+    worker_cache = cache
+
+def generate_page_batch(pages, template, basepath, profile = False, index_terms = False):
+    # runs in a worker process, errors are reported back as strings so they always pickle
+    if profile:
+        profiler.enable().pages = {}
+    result = {"failures": [], "metadata": {}, "timings": None, "cache": None}
+    index = PendingTerms() if index_terms else None
+    for from_path, dest_path in pages:
+        try:
+            result["metadata"][dest_path] = generate_page(from_path, template, dest_path, basepath, worker_cache, index)
+        except Exception as e:
+            result["failures"].append((from_path, f"{e.__class__.__name__}: {e}"))
+    if profile:
+        result["timings"] = profiler.active.pages
+    if worker_cache != None:
+        result["cache"] = (worker_cache.hits, worker_cache.misses, worker_cache.added)
+        worker_cache.hits, worker_cache.misses, worker_cache.added = 0, 0, {}
+    return result
+
+def generate_pages_recursive(dir_path_content: str, template_path, dest_dir_path, basepath, jobs = 1, cache = None):
+    tree = scan_content(dir_path_content, dest_dir_path)
+    return generate_pages(tree.all_pages(), Template.load(template_path, navigation=Navigation(tree)), basepath, jobs, cache)
+
+def generate_pages_incremental(pages, template, dest_dir_path, basepath, manifest_path, jobs = 1, cache = None, io_workers = 0, queue_depth = 32, index = None):
+    if not isinstance(template, Template):
+        template = Template.load(template)
+    manifest = Manifest.load(manifest_path)
+    to_render, removed = manifest.plan(pages, template.hash, basepath, template.assets, template.navigation)
+    for dest_path in removed:
+        print(f"Removing {dest_path}, its source no longer exists")
+        remove_output(dest_path, dest_dir_path)
+    manifest.metadata.update(generate_pages(to_render, template, basepath, jobs, cache, io_workers, queue_depth, index))
+    if template.assets != None:
+        # the plan went by the links from before, keep what the pages link to now
+        for _, dest_path in to_render:
+            manifest.pages[dest_path]["assets"] = template.assets.version(manifest.metadata[dest_path]["links"])
+    if index != None:
+        rendered = set(map(lambda page: page[1], to_render))
+        for from_path, dest_path in pages:
+            if dest_path not in rendered:
+                index.add_page(dest_path, manifest.metadata[dest_path])
+    manifest.save(manifest_path)
+    # metadata covers every page, not just the re-rendered ones
+    return to_render, removed, manifest.metadata
+
+def rebuild_changed(changed, removed, dir_path_content, static_dir_path, template_path, dest_dir_path, basepath, jobs = 1, cache = None, minify = False, assets = None, gzip = False, compress_manifest_path = COMPRESS_MANIFEST_PATH):
+    template_changed, pages, copies, removals = plan_changes(changed, removed, dir_path_content, static_dir_path, template_path, dest_dir_path)
+    if assets != None and any(map(lambda path: is_within(path, static_dir_path), changed + removed)):
+        # asset names and sizes end up in every page
+        stale = set(map(lambda copy: copy[1], assets.copies(dest_dir_path)))
+        assets.refresh()
+        fingerprinted = assets.copies(dest_dir_path)
+        removals += sorted(stale.difference(map(lambda copy: copy[1], fingerprinted)))
+        copies += fingerprinted
+        template_changed = True
+    tree = scan_content(dir_path_content, dest_dir_path)
+    template = Template.load(template_path, minify, assets, Navigation(tree))
+    if template.navigation != None and (any(map(lambda path: is_within(path, dir_path_content) and path.endswith(".md"), removed)) or any(map(lambda page: not os.path.exists(page[1]), pages))):
+        # a page came or went, which changes the navigation of the others
+        template_changed = True
+    if template_changed:
+        # every page depends on the template
+        pages = tree.all_pages()
+    if len(pages) > 0:
+        generate_pages(pages, template, basepath, jobs, cache)
+    apply_file_changes(copies, removals, dest_dir_path)
+    if gzip:
+        # otherwise the server keeps sending the .gz of the page from before the change
+        precompress(dest_dir_path, compress_manifest_path)
+
+if __name__ == "__main__":
+    main()
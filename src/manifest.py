@@ -0,0 +1,74 @@
+import hashlib, json, os
+
+from .rendercache import renderer_fingerprint
+
+MANIFEST_VERSION = 4
+
+def hash_file(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as file:
+        for chunk in iter(lambda: file.read(1 << 16), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+class Manifest:
+    def __init__(self, pages = None, sources = None, metadata = None):
+        # pages: dest path -> {"source", "hash", "template", "basepath", "renderer"}, "assets" with an AssetMap
+        # and "navigation" when the template has navigation slots
+        # sources: source path -> [size, mtime_ns, hash] so unchanged files aren't re-hashed
+        # metadata: dest path -> what generate_page reported, reused for pages that aren't re-rendered
+        self.pages = {} if pages == None else pages
+        self.sources = {} if sources == None else sources
+        self.metadata = {} if metadata == None else metadata
+
+    @classmethod
+    def load(cls, path):
+        try:
+            with open(path) as manifest_file:
+                data = json.load(manifest_file)
+            if data.get("version") != MANIFEST_VERSION:
+                return cls()
+            return cls(data["pages"], data["sources"], data["metadata"])
+        except (OSError, ValueError, KeyError, AttributeError):
+            # a missing or unreadable manifest just means a full rebuild
+            return cls()
+
+    def save(self, path):
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w') as manifest_file:
+            json.dump({"version": MANIFEST_VERSION, "pages": self.pages, "sources": self.sources, "metadata": self.metadata}, manifest_file, indent=1, sort_keys=True)
+        os.replace(tmp_path, path)
+
+    def source_hash(self, source_path):
+        stat = os.stat(source_path)
+        cached = self.sources.get(source_path)
+        if cached != None and cached[0] == stat.st_size and cached[1] == stat.st_mtime_ns:
+            return cached[2]
+        digest = hash_file(source_path)
+        self.sources[source_path] = [stat.st_size, stat.st_mtime_ns, digest]
+        return digest
+
+    # Returns the (source, dest) pairs that need rendering and the dests whose sources are gone.
+    # With assets, a page is also re-rendered when a static file it linked to last time changed,
+    # with navigation when the pages around it did.
+    def plan(self, pages, template_hash, basepath, assets = None, navigation = None):
+        entries = {}
+        to_render = []
+        # pages rendered by a different renderer have different html, whatever their source
+        renderer = renderer_fingerprint()
+        for source_path, dest_path in pages:
+            entry = {"source": source_path, "hash": self.source_hash(source_path), "template": template_hash, "basepath": basepath, "renderer": renderer}
+            if assets != None:
+                entry["assets"] = assets.version(self.metadata.get(dest_path, {}).get("links", []))
+            if navigation != None:
+                entry["navigation"] = navigation.version(dest_path)
+            entries[dest_path] = entry
+            if self.pages.get(dest_path) != entry or not os.path.exists(dest_path):
+                to_render.append((source_path, dest_path))
+        removed = [dest_path for dest_path in self.pages if dest_path not in entries]
+        sources = {entry["source"] for entry in entries.values()}
+        self.sources = {path: cached for path, cached in self.sources.items() if path in sources}
+        self.pages = entries
+        stale = set(removed).union(map(lambda page: page[1], to_render))
+        self.metadata = {dest_path: meta for dest_path, meta in self.metadata.items() if dest_path not in stale}
+        return to_render, removed
@@ -0,0 +1,82 @@
+import re
+
+# elements whose text is shown or run exactly as written
+RAW_TAG_PATTERN = re.compile(r"<(pre|textarea|script|style)\b", re.IGNORECASE)
+RAW_END_PATTERNS = {tag: re.compile(rf"</{tag}\s*>", re.IGNORECASE) for tag in ["pre", "textarea", "script", "style"]}
+# conditional comments are kept, browsers still read those
+COMMENT_PATTERN = re.compile(r"<!--(?!\[if).*?-->", re.DOTALL)
+# only ascii whitespace collapses, a &nbsp; typed as \xa0 is content
+LINE_BREAK_PATTERN = re.compile(r"[ \t\r\f]*\n[ \t\r\n\f]*")
+SPACE_PATTERN = re.compile(r"[ \t\r\f]{2,}|[\t\r\f]")
+
+# Collapses whitespace runs to a single newline or space and drops comments from a stream of html
+# fragments. Runs are collapsed rather than removed, so the space between inline elements survives.
+# Everything from a <pre>, <textarea>, <script> or <style> tag to its end tag is passed through as is,
+# the code blocks markdown_to_html_node renders into <pre> keep their indentation and blank lines.
+# A raw element's start and end tags each have to be within one fragment, which is how the renderer and
+# template emit them.
+class Minifier:
+    def __init__(self):
+        self.raw_end = None
+        # whitespace run at the end of the text so far, held back until it's known whether the
+        # next fragment continues it. A run with a line break collapses to '\n', others to ' '.
+        self.space = ""
+
+    def iter(self, fragments):
+        for fragment in fragments:
+            minified = self.feed(fragment)
+            if len(minified) != 0:
+                yield minified
+        if len(self.space) != 0:
+            yield self.flush()
+
+    def feed(self, fragment):
+        parts = []
+        pos = 0
+        while pos < len(fragment):
+            if self.raw_end != None:
+                match = self.raw_end.search(fragment, pos)
+                end = len(fragment) if match == None else match.end()
+                parts.append(self.flush())
+                parts.append(fragment[pos:end])
+                if match != None:
+                    self.raw_end = None
+                pos = end
+                continue
+            match = RAW_TAG_PATTERN.search(fragment, pos)
+            end = len(fragment) if match == None else match.start()
+            parts.append(self.collapse(fragment[pos:end]))
+            if match != None:
+                self.raw_end = RAW_END_PATTERNS[match[1].lower()]
+            pos = end
+        return ''.join(parts)
+
+    def collapse(self, text):
+        if "<!--" in text:
+            text = COMMENT_PATTERN.sub("", text)
+        text = SPACE_PATTERN.sub(' ', LINE_BREAK_PATTERN.sub('\n', text))
+        if text[:1] in (' ', '\n'):
+            self.add_space(text[0])
+            text = text[1:]
+        if len(text) == 0:
+            return ""
+        space = ""
+        if text[-1] in (' ', '\n'):
+            space = text[-1]
+            text = text[:-1]
+        text = self.flush() + text
+        self.space = space
+        return text
+
+    def add_space(self, space):
+        if self.space != '\n':
+            self.space = space
+
+    def flush(self):
+        space = self.space
+        self.space = ""
+        return space
+
+def minify(html):
+    minifier = Minifier()
+    return minifier.feed(html) + minifier.flush()
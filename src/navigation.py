@@ -0,0 +1,143 @@
+import hashlib, os
+from urllib.parse import quote
+
+from .htmlnode import escape_attribute, escape_text
+
+# template slots filled in from the content tree
+NAV_SLOTS = ("Navigation", "Siblings", "Breadcrumbs")
+
+# A directory of the content tree: its (source, dest) pages and subdirectories, both by name.
+class ContentDir:
+    def __init__(self, name, source_path, dest_path, parent = None):
+        self.name = name
+        self.source_path = source_path
+        self.dest_path = dest_path
+        self.parent = parent
+        # the site url of the directory, its index page is served there
+        self.url = "/" if parent == None else f"{parent.url}{name}/"
+        self.pages = []
+        self.dirs = []
+        # dest path of the directory's index.html, if it has an index.md
+        self.index = None
+
+    def walk(self):
+        stack = [self]
+        while len(stack) > 0:
+            content_dir = stack.pop()
+            yield content_dir
+            stack.extend(reversed(content_dir.dirs))
+
+    def all_pages(self):
+        pages = []
+        for content_dir in self.walk():
+            pages.extend(content_dir.pages)
+        return pages
+
+# Reads the content tree with one scandir per directory. The entry types come with the listing,
+# so unlike an isfile/isdir walk nothing is stat'ed.
+def scan_content(dir_path_content, dest_dir_path, name = "", parent = None):
+    content_dir = ContentDir(name, dir_path_content, dest_dir_path, parent)
+    with os.scandir(dir_path_content) as entries:
+        entries = sorted(entries, key=lambda entry: entry.name)
+    for entry in entries:
+        if entry.name.endswith(".md") and entry.is_file():
+            dest_path = os.path.join(dest_dir_path, entry.name.replace('.md', '.html'))
+            content_dir.pages.append((entry.path, dest_path))
+            if entry.name == "index.md":
+                content_dir.index = dest_path
+        elif entry.is_dir():
+            content_dir.dirs.append(scan_content(entry.path, os.path.join(dest_dir_path, entry.name), entry.name, content_dir))
+    return content_dir
+
+# Renders the navigation slots of every page from the content tree. Links are labelled with file and
+# directory names, the titles would mean opening every page first. The site wide menu is built once
+# and the sibling list once per directory, pages only add their own breadcrumbs.
+class Navigation:
+    def __init__(self, root):
+        self.root = root
+        self.dirs = {os.path.normpath(content_dir.dest_path): content_dir for content_dir in root.walk()}
+        self.__menu = None
+        self.__siblings = {}
+        self.__trails = {}
+        self.__versions = {}
+
+    def label(self, content_dir):
+        return "Home" if content_dir.parent == None else content_dir.name
+
+    def link(self, url, label):
+        if url == None:
+            return f"<li>{escape_text(label)}</li>"
+        return f'<li><a href="{escape_attribute(quote(url))}">{escape_text(label)}</a></li>'
+
+    # a directory links to its index page, there's nothing to link to without one
+    def dir_link(self, content_dir):
+        return self.link(None if content_dir.index == None else content_dir.url, self.label(content_dir))
+
+    # pages first, then the directories
+    def entries(self, content_dir):
+        links = []
+        for _, dest_path in content_dir.pages:
+            if dest_path != content_dir.index:
+                name = os.path.basename(dest_path)
+                links.append(self.link(content_dir.url + name, name[:-len(".html")]))
+        links += map(self.dir_link, content_dir.dirs)
+        return links
+
+    def menu(self):
+        if self.__menu == None:
+            self.__menu = ''.join(["<ul>", self.dir_link(self.root)] + self.entries(self.root) + ["</ul>"])
+        return self.__menu
+
+    def siblings(self, content_dir):
+        html = self.__siblings.get(content_dir.dest_path)
+        if html == None:
+            entries = self.entries(content_dir)
+            html = "" if len(entries) == 0 else ''.join(["<ul>"] + entries + ["</ul>"])
+            self.__siblings[content_dir.dest_path] = html
+        return html
+
+    # the crumbs from the root down to content_dir, shared by the pages under it
+    def trail(self, content_dir):
+        if content_dir == None:
+            return "<ol>"
+        trail = self.__trails.get(content_dir.dest_path)
+        if trail == None:
+            trail = self.trail(content_dir.parent) + self.dir_link(content_dir)
+            self.__trails[content_dir.dest_path] = trail
+        return trail
+
+    def breadcrumbs(self, content_dir, dest_path):
+        # the page itself is the last crumb, for an index page that's its directory's crumb
+        if dest_path == content_dir.index:
+            return f'{self.trail(content_dir.parent)}<li aria-current="page">{escape_text(self.label(content_dir))}</li></ol>'
+        return f'{self.trail(content_dir)}<li aria-current="page">{escape_text(os.path.basename(dest_path)[:-len(".html")])}</li></ol>'
+
+    def slots(self, dest_path):
+        content_dir = self.dirs[os.path.normpath(os.path.dirname(dest_path))]
+        return {"Navigation": self.menu(), "Siblings": self.siblings(content_dir), "Breadcrumbs": self.breadcrumbs(content_dir, dest_path)}
+
+    # A digest of everything a page's slots are made of besides its own path. Pages in a
+    # directory share it, so an incremental build re-renders them when the tree around them changes.
+    def version(self, dest_path):
+        dir_path = os.path.normpath(os.path.dirname(dest_path))
+        version = self.__versions.get(dir_path)
+        if version == None:
+            content_dir = self.dirs[dir_path]
+            digest = hashlib.sha256(self.menu().encode())
+            digest.update(self.siblings(content_dir).encode())
+            ancestor = content_dir
+            while ancestor != None:
+                digest.update(f"\0{ancestor.index}".encode())
+                ancestor = ancestor.parent
+            version = digest.hexdigest()
+            self.__versions[dir_path] = version
+        return version
+
+    def __getstate__(self):
+        # workers render their own html, only the tree is sent
+        state = self.__dict__.copy()
+        state["_Navigation__menu"] = None
+        state["_Navigation__siblings"] = {}
+        state["_Navigation__trails"] = {}
+        state["_Navigation__versions"] = {}
+        return state
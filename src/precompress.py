@@ -0,0 +1,83 @@
+import gzip, json, os
+from concurrent.futures import ThreadPoolExecutor
+
+from .manifest import hash_file
+
+COMPRESSIBLE = (".html", ".css", ".js", ".json", ".xml", ".svg", ".txt")
+COMPRESSED_SUFFIX = ".gz"
+
+def compressible_files(dest_dir_path):
+    paths = []
+    for dir_path, _, file_names in os.walk(dest_dir_path):
+        for file_name in file_names:
+            if file_name.endswith(COMPRESSIBLE):
+                paths.append(os.path.join(dir_path, file_name))
+    return sorted(paths)
+
+# writes path.gz next to path, unless compressing doesn't make it any smaller
+def compress_file(path):
+    with open(path, 'rb') as source_file:
+        data = source_file.read()
+    # mtime=0 keeps the .gz identical for identical input
+    compressed = gzip.compress(data, compresslevel=9, mtime=0)
+    gz_path = path + COMPRESSED_SUFFIX
+    if len(compressed) >= len(data):
+        if os.path.exists(gz_path):
+            os.remove(gz_path)
+        return False
+    tmp_path = f"{gz_path}.tmp"
+    with open(tmp_path, 'wb') as gz_file:
+        gz_file.write(compressed)
+    os.replace(tmp_path, gz_path)
+    return True
+
+# Writes a precompressed .gz sibling for every compressible file under dest_dir, so a CDN or
+# server can send it as is. Outputs whose content hash matches what was compressed last time are
+# skipped, unless their .gz went missing. The hashes live in manifest_path with the same size and
+# mtime cache Manifest uses, along with whether the .gz was worth writing. Only .gz files recorded
+# there are ever removed, any other .gz under dest_dir (e.g. a static archive.tar.gz) is left alone.
+# zlib releases the GIL while it compresses, so the files are compressed on a thread pool.
+# Returns the compressed and the removed .gz paths.
+def precompress(dest_dir_path, manifest_path, jobs = 0):
+    try:
+        with open(manifest_path) as manifest_file:
+            hashes = json.load(manifest_file)
+    except (OSError, ValueError):
+        hashes = {}
+    if not isinstance(hashes, dict) or any(map(lambda entry: not isinstance(entry, list) or len(entry) != 4, hashes.values())):
+        hashes = {}
+    current = {}
+    to_compress = []
+    for path in compressible_files(dest_dir_path):
+        stat = os.stat(path)
+        cached = hashes.get(path)
+        if cached != None and cached[0] == stat.st_size and cached[1] == stat.st_mtime_ns:
+            digest = cached[2]
+        else:
+            digest = hash_file(path)
+        if cached != None and cached[2] == digest and (not cached[3] or os.path.exists(path + COMPRESSED_SUFFIX)):
+            current[path] = [stat.st_size, stat.st_mtime_ns, digest, cached[3]]
+        else:
+            current[path] = [stat.st_size, stat.st_mtime_ns, digest, False]
+            to_compress.append(path)
+    compressed = []
+    with ThreadPoolExecutor(jobs or os.cpu_count() or 1) as executor:
+        for path, written in zip(to_compress, executor.map(compress_file, to_compress)):
+            current[path][3] = written
+            if written:
+                compressed.append(path + COMPRESSED_SUFFIX)
+    # .gz files written for outputs that are gone
+    removed = []
+    for path, entry in sorted(hashes.items()):
+        if entry[3] and path not in current:
+            try:
+                os.remove(path + COMPRESSED_SUFFIX)
+                removed.append(path + COMPRESSED_SUFFIX)
+            except FileNotFoundError:
+                pass
+    tmp_path = f"{manifest_path}.tmp"
+    with open(tmp_path, 'w') as manifest_file:
+        json.dump(current, manifest_file, indent=1, sort_keys=True)
+    os.replace(tmp_path, manifest_path)
+    print(f"Precompressed {len(compressed)} files in {dest_dir_path}, {len(current) - len(to_compress)} unchanged, {len(removed)} stale .gz removed")
+    return compressed, removed
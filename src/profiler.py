@@ -0,0 +1,145 @@
+import functools, json, time
+
+from . import htmlnode
+from .template import Template
+
+STAGES = ["read", "markdown_to_blocks", "block_to_block_type", "text_to_textnodes", "markdown_to_html_node", "to_html", "template", "write"]
+
+# set by enable(), generate_page only pays for a None check per page while this is off
+active = None
+
+class Profile:
+    def __init__(self):
+        self.pages = {} # source path -> {stage: seconds}
+        self.__stack = [] # [stage, started] so time in nested stages isn't counted twice
+        self.__page = None
+        self.__page_started = 0
+
+    def start_page(self, path):
+        self.__page = self.pages.setdefault(path, dict.fromkeys(STAGES + ["other", "total"], 0.0))
+        self.__page_started = time.perf_counter()
+
+    def end_page(self):
+        total = time.perf_counter() - self.__page_started
+        self.__page["total"] += total
+        self.__page["other"] = self.__page["total"] - sum(map(lambda stage: self.__page[stage], STAGES))
+        self.__page = None
+        self.__stack = []
+
+    def push(self, stage):
+        now = time.perf_counter()
+        if len(self.__stack) > 0:
+            self.__credit(now)
+        self.__stack.append([stage, now])
+
+    def pop(self):
+        now = time.perf_counter()
+        self.__credit(now)
+        self.__stack.pop()
+        if len(self.__stack) > 0:
+            self.__stack[-1][1] = now
+
+    def __credit(self, now):
+        stage, started = self.__stack[-1]
+        if self.__page != None:
+            self.__page[stage] += now - started
+
+    def timed(self, stage, func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            self.push(stage)
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self.pop()
+        return wrapper
+
+    def timed_iter(self, stage, iterable):
+        iterator = iter(iterable)
+        while True:
+            self.push(stage)
+            try:
+                item = next(iterator)
+            except StopIteration:
+                return
+            finally:
+                self.pop()
+            yield item
+
+    def timed_writer(self, stream):
+        return TimedWriter(self, stream)
+
+    def merge(self, pages):
+        self.pages.update(pages)
+
+    def totals(self):
+        totals = dict.fromkeys(STAGES + ["other", "total"], 0.0)
+        for stages in self.pages.values():
+            for stage, seconds in stages.items():
+                totals[stage] += seconds
+        return totals
+
+    def slowest(self, count):
+        return sorted(self.pages.items(), key=lambda page: page[1]["total"], reverse=True)[:count]
+
+    def report(self, top = 10):
+        totals = self.totals()
+        lines = [f"Profiled {len(self.pages)} page(s), {totals['total'] * 1000:.1f} ms total"]
+        for stage in STAGES + ["other"]:
+            share = totals[stage] / totals["total"] * 100 if totals["total"] > 0 else 0
+            lines.append(f"  {stage:<24}{totals[stage] * 1000:>10.1f} ms{share:>7.1f}%")
+        lines.append(f"Slowest {min(top, len(self.pages))} page(s):")
+        for path, stages in self.slowest(top):
+            lines.append(f"  {stages['total'] * 1000:>10.1f} ms  {path}")
+        return '\n'.join(lines)
+
+    def save(self, path):
+        with open(path, 'w') as report_file:
+            json.dump({"stages": STAGES + ["other"], "totals": self.totals(), "pages": self.pages}, report_file, indent=1)
+
+class TimedWriter:
+    def __init__(self, profile, stream):
+        self.profile = profile
+        self.stream = stream
+
+    def write(self, text):
+        self.profile.push("write")
+        try:
+            return self.stream.write(text)
+        finally:
+            self.profile.pop()
+
+    def writelines(self, lines):
+        for line in lines:
+            self.write(line)
+
+__originals = {}
+
+# Swaps timed wrappers in for the functions the page pipeline looks up at call time.
+def enable():
+    global active
+    if active != None:
+        return active
+    active = Profile()
+    targets = [
+        (htmlnode, "block_to_block_type", "block_to_block_type"),
+        (htmlnode, "text_to_textnodes", "text_to_textnodes"),
+        (htmlnode, "block_to_html_node", "markdown_to_html_node"),
+    ]
+    for module, name, stage in targets:
+        __originals[(module, name)] = getattr(module, name)
+        setattr(module, name, active.timed(stage, getattr(module, name)))
+    iter_html = htmlnode.HTMLNode.iter_html
+    iter_render = Template.iter_render
+    __originals[(htmlnode.HTMLNode, "iter_html")] = iter_html
+    __originals[(Template, "iter_render")] = iter_render
+    htmlnode.HTMLNode.iter_html = lambda node: active.timed_iter("to_html", iter_html(node))
+    Template.iter_render = lambda template, basepath, slots: active.timed_iter("template", iter_render(template, basepath, slots))
+    return active
+
+def disable():
+    global active
+    for (owner, name), original in __originals.items():
+        setattr(owner, name, original)
+    __originals.clear()
+    active = None
@@ -0,0 +1,89 @@
+import hashlib, json, os
+from collections import OrderedDict
+
+from . import htmlnode, textnode, texthandling
+
+CACHE_VERSION = 2
+
+# cached html is only valid for the renderer that produced it
+def renderer_fingerprint():
+    digest = hashlib.sha256(str(CACHE_VERSION).encode())
+    for module in (htmlnode, textnode, texthandling):
+        with open(module.__file__, 'rb') as source_file:
+            digest.update(source_file.read())
+    return digest.hexdigest()
+
+# [html, text, urls] of a cached block, as iter_markdown_html stores it
+def entry_size(key, entry):
+    return len(key) + len(entry[0]) + len(entry[1]) + sum(map(len, entry[2]))
+
+# Maps the hash of a raw markdown block to its rendered html and text, least recently used
+# entries are evicted once they go over max_bytes.
+class RenderCache:
+    def __init__(self, max_bytes = 64 * 2**20, path = None):
+        self.max_bytes = max_bytes
+        self.path = path
+        self.entries = OrderedDict()
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        # entries rendered since the cache was created, workers send these back to be persisted
+        self.added = {}
+
+    @staticmethod
+    def key(block):
+        return hashlib.blake2b(block.encode(), digest_size=16).hexdigest()
+
+    def get(self, key):
+        entry = self.entries.get(key)
+        if entry == None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.entries.move_to_end(key)
+        return entry
+
+    def put(self, key, entry, track = True):
+        size = entry_size(key, entry)
+        if size > self.max_bytes or key in self.entries:
+            return
+        self.entries[key] = entry
+        self.size += size
+        if track and self.path != None:
+            self.added[key] = entry
+        while self.size > self.max_bytes:
+            old_key, old_entry = self.entries.popitem(last=False)
+            self.size -= entry_size(old_key, old_entry)
+            self.evictions += 1
+
+    def merge(self, hits, misses, added):
+        self.hits += hits
+        self.misses += misses
+        for key, entry in added.items():
+            self.put(key, entry)
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        rate = self.hits / lookups * 100 if lookups > 0 else 0
+        return f"Render cache: {self.hits} hits, {self.misses} misses ({rate:.1f}% hit rate), {self.evictions} evictions, {len(self.entries)} entries using {self.size / 2**20:.1f} MiB"
+
+    @classmethod
+    def load(cls, path, max_bytes = 64 * 2**20):
+        cache = cls(max_bytes, path)
+        try:
+            with open(path) as cache_file:
+                data = json.load(cache_file)
+        except (OSError, ValueError):
+            return cache
+        if not isinstance(data, dict) or data.get("renderer") != renderer_fingerprint():
+            return cache
+        for key, entry in data["entries"]:
+            cache.put(key, entry, track=False)
+        return cache
+
+    def save(self):
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w') as cache_file:
+            json.dump({"renderer": renderer_fingerprint(), "entries": list(self.entries.items())}, cache_file)
+        os.replace(tmp_path, self.path)
@@ -0,0 +1,147 @@
+import itertools, json, os, re
+from collections import Counter
+
+from .htmlnode import block_to_html_node, rendered_text
+from .linkgraph import page_url
+from .texthandling import extract_title, iter_markdown_blocks
+
+SEARCH_DIR = "search"
+SEARCH_VERSION = 1
+TERM_PATTERN = re.compile(r"[^\W_]+")
+
+def tokenize(text):
+    return TERM_PATTERN.findall(text.casefold())
+
+# A reader of iter_markdown_html like WordCounter, counting the terms of the text the renderer
+# already produced. Link and image urls never become terms, code is indexed as is.
+class TermCounter:
+    def __init__(self):
+        self.terms = Counter()
+
+    def read(self, text, urls):
+        self.terms.update(tokenize(text))
+
+# the terms of a block that isn't being rendered anyway
+def tokenize_block(block):
+    return tokenize(rendered_text(block_to_html_node(block))[0])
+
+# files of the index from the last build
+def index_files(dest_dir_path):
+    dir_path = os.path.join(dest_dir_path, SEARCH_DIR)
+    if not os.path.isdir(dir_path):
+        return []
+    return list(map(lambda name: os.path.join(dir_path, name), os.listdir(dir_path)))
+
+# "ri" -> "ri", anything that isn't safe as a file name is hex encoded
+def shard_name(prefix):
+    if prefix.isascii() and prefix.isalnum():
+        return prefix
+    return "_" + prefix.encode().hex()
+
+# Builds the inverted index under dest_dir/search as pages are generated:
+#   index.json      shard names, docs per chunk and the prefix length
+#   docs-N.json     [url, title] for doc ids N * docs_per_chunk and up
+#   <prefix>.json   term -> [[doc id, term frequency], ...] for the terms starting with prefix
+# Postings are spilled to disk once more than max_postings are buffered and each shard is merged
+# on its own in close(), so memory stays bounded however many pages the site has.
+class SearchIndexWriter:
+    def __init__(self, dest_dir_path, basepath, prefix_length = 2, docs_per_chunk = 1000, max_postings = 500_000):
+        self.dest_dir_path = dest_dir_path
+        self.basepath = basepath
+        self.dir_path = os.path.join(dest_dir_path, SEARCH_DIR)
+        self.prefix_length = prefix_length
+        self.docs_per_chunk = docs_per_chunk
+        self.max_postings = max_postings
+        self.docs = []
+        self.doc_count = 0
+        self.postings = {}
+        self.buffered = 0
+        self.spilled = set()
+        self.written = set()
+        os.makedirs(self.dir_path, exist_ok=True)
+
+    def add(self, dest_path, title, terms):
+        doc = self.doc_count
+        self.doc_count += 1
+        self.docs.append([page_url(dest_path, self.dest_dir_path, self.basepath), title])
+        if len(self.docs) == self.docs_per_chunk:
+            self.write_docs()
+        for term, frequency in terms.items():
+            shard = self.postings.setdefault(term[:self.prefix_length], {})
+            shard.setdefault(term, []).append([doc, frequency])
+        self.buffered += len(terms)
+        if self.buffered > self.max_postings:
+            self.spill()
+
+    # Adds a page that wasn't rendered by this build, from the terms its metadata kept or, for
+    # metadata from a build without an index, by tokenizing its source.
+    def add_page(self, dest_path, meta):
+        if "terms" in meta:
+            self.add(dest_path, meta["title"], meta["terms"])
+        else:
+            self.add_source(meta["source"], dest_path)
+
+    def add_source(self, from_path, dest_path):
+        terms = Counter()
+        with open(from_path) as markdown_file:
+            first_line = markdown_file.readline()
+            for block in iter_markdown_blocks(itertools.chain([first_line], markdown_file)):
+                terms.update(tokenize_block(block))
+        self.add(dest_path, extract_title(first_line), terms)
+
+    def write_docs(self):
+        self.write(f"docs-{(self.doc_count - 1) // self.docs_per_chunk}.json", self.docs)
+        self.docs = []
+
+    def spill(self):
+        for prefix, terms in self.postings.items():
+            with open(os.path.join(self.dir_path, f".{shard_name(prefix)}.spill"), 'a') as spill_file:
+                spill_file.write(json.dumps([prefix, terms]) + '\n')
+            self.spilled.add(prefix)
+        self.postings = {}
+        self.buffered = 0
+
+    def merge_shard(self, prefix):
+        terms = {}
+        if prefix in self.spilled:
+            spill_path = os.path.join(self.dir_path, f".{shard_name(prefix)}.spill")
+            with open(spill_path) as spill_file:
+                for line in spill_file:
+                    for term, postings in json.loads(line)[1].items():
+                        terms.setdefault(term, []).extend(postings)
+            os.remove(spill_path)
+        # doc ids only grow, so buffered postings go after the spilled ones
+        for term, postings in self.postings.pop(prefix, {}).items():
+            terms.setdefault(term, []).extend(postings)
+        return terms
+
+    def write(self, name, data):
+        with open(os.path.join(self.dir_path, name), 'w') as index_file:
+            json.dump(data, index_file, separators=(',', ':'))
+        self.written.add(name)
+
+    # returns the paths of every file in the index
+    def close(self):
+        if len(self.docs) > 0:
+            self.write_docs()
+        shards = sorted(self.spilled | self.postings.keys())
+        for prefix in shards:
+            self.write(f"{shard_name(prefix)}.json", self.merge_shard(prefix))
+        self.write("index.json", {
+            "version": SEARCH_VERSION,
+            "prefix_length": self.prefix_length,
+            "docs_per_chunk": self.docs_per_chunk,
+            "docs": self.doc_count,
+            "shards": {prefix: shard_name(prefix) for prefix in shards},
+        })
+        # shards and doc chunks left over from a bigger site
+        for name in os.listdir(self.dir_path):
+            if name not in self.written:
+                os.remove(os.path.join(self.dir_path, name))
+        return sorted(map(lambda name: os.path.join(self.dir_path, name), self.written))
+
+# stands in for the index inside worker processes, the terms come back in the pages' metadata
+# and are added to the real one from there
+class PendingTerms:
+    def add(self, dest_path, title, terms):
+        pass
@@ -0,0 +1,153 @@
+import functools, hashlib, os, threading
+from collections import OrderedDict
+from io import BytesIO
+from http import HTTPStatus
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import unquote, urlsplit
+
+from .builder import Site, is_within
+
+# Rendered pages by source path, least recently used first. An entry is only valid for the source and
+# template mtimes it was rendered from, so editing either re-renders on the next request.
+class PageCache:
+    def __init__(self, max_bytes = 64 * 2**20):
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.size = 0
+        self.lock = threading.Lock()
+
+    def get(self, path, version):
+        with self.lock:
+            entry = self.entries.get(path)
+            if entry == None or entry[0] != version:
+                return None
+            self.entries.move_to_end(path)
+            return entry
+
+    def put(self, path, version, body):
+        entry = (version, body, '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"')
+        with self.lock:
+            old = self.entries.pop(path, None)
+            if old != None:
+                self.size -= len(old[1])
+            if len(body) <= self.max_bytes:
+                self.entries[path] = entry
+                self.size += len(body)
+            while self.size > self.max_bytes:
+                _, (_, old_body, _) = self.entries.popitem(last=False)
+                self.size -= len(old_body)
+        return entry
+
+# the markdown files a url can come from, relative to the content directory
+def source_candidates(path):
+    if path == "" or path.endswith('/'):
+        return [f"{path}index.md"]
+    if path.endswith(".html"):
+        return [f"{path[:-len('.html')]}.md"]
+    return [f"{path}.md", f"{path}/index.md"]
+
+# Serves pages by rendering their markdown when they're requested instead of building the site
+# first, everything else comes out of the static directory.
+class DevServer(ThreadingHTTPServer):
+    def __init__(self, address, root_path = ".", basepath = "/", cache_bytes = 64 * 2**20):
+        self.site = Site(root_path, basepath)
+        super().__init__(address, functools.partial(DevRequestHandler, directory=self.site.static_dir_path))
+        self.pages = PageCache(cache_bytes)
+        self.template_mtime = os.stat(self.site.template_path).st_mtime_ns
+        self.template_lock = threading.Lock()
+        # only templates with navigation slots depend on the content tree
+        self.content_mtimes = None if self.site.template.navigation == None else self.dir_mtimes()
+
+    # returns the path under basepath, or None for urls outside of it
+    def site_path(self, url):
+        path = unquote(urlsplit(url).path)
+        basepath = self.site.basepath
+        if path + '/' == basepath:
+            return ""
+        if not path.startswith(basepath):
+            return None
+        return path[len(basepath):]
+
+    def template_version(self):
+        mtime = os.stat(self.site.template_path).st_mtime_ns
+        if mtime != self.template_mtime:
+            with self.template_lock:
+                self.site.load_template()
+                self.template_mtime = mtime
+        return mtime
+
+    # the mtimes of the content tree's directories, None for one that's gone
+    def dir_mtimes(self):
+        mtimes = []
+        for content_dir in self.site.tree.walk():
+            try:
+                mtimes.append(os.stat(content_dir.source_path).st_mtime_ns)
+            except FileNotFoundError:
+                mtimes.append(None)
+        return tuple(mtimes)
+
+    # With navigation slots every page lists the others. A directory's mtime changes when a page or
+    # subdirectory in it comes or goes, the tree is only read again then.
+    def content_version(self):
+        if self.site.template.navigation == None:
+            return None
+        mtimes = self.dir_mtimes()
+        if mtimes != self.content_mtimes:
+            with self.template_lock:
+                self.site.scan()
+                self.content_mtimes = self.dir_mtimes()
+        return self.content_mtimes
+
+    # returns (body, etag) for the page at path, or None when no markdown file matches it
+    def page(self, path):
+        for candidate in source_candidates(path):
+            source_path = os.path.join(self.site.dir_path_content, candidate)
+            if not is_within(source_path, self.site.dir_path_content):
+                return None
+            try:
+                stat = os.stat(source_path)
+            except (FileNotFoundError, NotADirectoryError):
+                continue
+            version = (stat.st_mtime_ns, stat.st_size, self.template_version(), self.content_version())
+            entry = self.pages.get(candidate, version)
+            if entry == None:
+                entry = self.pages.put(candidate, version, self.site.render_page(candidate).encode())
+            return entry[1], entry[2]
+        return None
+
+class DevRequestHandler(SimpleHTTPRequestHandler):
+    def send_head(self):
+        path = self.server.site_path(self.path)
+        if path == None:
+            self.send_error(HTTPStatus.NOT_FOUND)
+            return None
+        try:
+            page = self.server.page(path)
+        except Exception as e:
+            self.send_error(HTTPStatus.INTERNAL_SERVER_ERROR, f"{e.__class__.__name__}: {e}")
+            return None
+        if page == None:
+            return super().send_head()
+        body, etag = page
+        if etag in map(str.strip, self.headers.get("If-None-Match", "").split(',')):
+            self.send_response(HTTPStatus.NOT_MODIFIED)
+            self.send_header("ETag", etag)
+            self.end_headers()
+            return None
+        self.send_response(HTTPStatus.OK)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("ETag", etag)
+        self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+        return BytesIO(body)
+
+    # static files are looked up under basepath too
+    def translate_path(self, path):
+        site_path = self.server.site_path(path)
+        return super().translate_path('/' + (site_path or ""))
+
+def serve(port = 8888, root_path = ".", basepath = "/", cache_bytes = 64 * 2**20):
+    with DevServer(("", port), root_path, basepath, cache_bytes) as server:
+        print(f"Serving {root_path} on http://localhost:{port}{basepath}, pages are rendered when requested")
+        server.serve_forever()
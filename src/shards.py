@@ -0,0 +1,85 @@
+import hashlib, json, os
+
+from .sync import sync_file
+
+SHARD_MANIFEST = ".shard.json"
+
+# "2/4" -> (2, 4), shards are numbered from 1
+def parse_shard(text):
+    index, _, count = text.partition('/')
+    try:
+        index, count = int(index), int(count)
+    except ValueError:
+        raise ValueError(f"shard must look like i/N, got {text}")
+    if count < 1 or not 1 <= index <= count:
+        raise ValueError(f"shard {index} of {count} doesn't exist, i has to be between 1 and N")
+    return index, count
+
+# The shard a source belongs to only depends on its path under the content directory, so every
+# CI node agrees on the split whatever order the files were found in.
+def shard_of(path, dir_path_content, count):
+    key = os.path.relpath(path, dir_path_content).replace(os.sep, '/').encode()
+    return int.from_bytes(hashlib.blake2b(key, digest_size=8).digest(), "big") % count + 1
+
+def shard_pages(pages, dir_path_content, index, count):
+    return [(from_path, dest_path) for from_path, dest_path in pages if shard_of(from_path, dir_path_content, count) == index]
+
+# Written next to a shard's output so merge can check the shards fit together and
+# rebuild the site wide artifacts without re-rendering anything.
+def write_shard_manifest(dest_dir_path, index, count, basepath, metadata):
+    manifest = {
+        "shard": index,
+        "shards": count,
+        "basepath": basepath,
+        "metadata": {os.path.relpath(dest_path, dest_dir_path).replace(os.sep, '/'): meta for dest_path, meta in metadata.items()},
+    }
+    with open(os.path.join(dest_dir_path, SHARD_MANIFEST), 'w') as manifest_file:
+        json.dump(manifest, manifest_file, indent=1, sort_keys=True)
+
+def load_shard_manifest(shard_dir_path):
+    try:
+        with open(os.path.join(shard_dir_path, SHARD_MANIFEST)) as manifest_file:
+            return json.load(manifest_file)
+    except (OSError, ValueError):
+        raise ValueError(f"{shard_dir_path} has no readable {SHARD_MANIFEST}, is it a shard's output?")
+
+# Copies every shard's output into dest_dir and returns the basepath and the combined metadata.
+# Anything in dest_dir that no shard produced is removed, like sync_tree does for static files.
+def merge_shards(shard_dir_paths, dest_dir_path):
+    manifests = list(map(load_shard_manifest, shard_dir_paths))
+    count = manifests[0]["shards"]
+    basepath = manifests[0]["basepath"]
+    found = sorted(map(lambda manifest: manifest["shard"], manifests))
+    if any(map(lambda manifest: manifest["shards"] != count or manifest["basepath"] != basepath, manifests)):
+        raise ValueError("shards were built with different shard counts or basepaths")
+    if found != list(range(1, count + 1)):
+        raise ValueError(f"expected shards 1 to {count} once each, got {', '.join(map(str, found))}")
+    metadata = {}
+    expected = set()
+    copied = 0
+    for shard_dir_path, manifest in zip(shard_dir_paths, manifests):
+        for path, meta in manifest["metadata"].items():
+            metadata[os.path.join(dest_dir_path, path)] = meta
+        for dir_path, _, file_names in os.walk(shard_dir_path):
+            for file_name in file_names:
+                src_path = os.path.join(dir_path, file_name)
+                if os.path.normpath(src_path) == os.path.normpath(os.path.join(shard_dir_path, SHARD_MANIFEST)):
+                    continue
+                dest_path = os.path.normpath(os.path.join(dest_dir_path, os.path.relpath(src_path, shard_dir_path)))
+                # static files are in every shard, the first copy wins
+                if dest_path in expected:
+                    continue
+                expected.add(dest_path)
+                if sync_file(src_path, dest_path):
+                    copied += 1
+    removed = 0
+    for dir_path, _, file_names in os.walk(dest_dir_path, topdown=False):
+        for file_name in file_names:
+            dest_path = os.path.normpath(os.path.join(dir_path, file_name))
+            if dest_path not in expected:
+                os.remove(dest_path)
+                removed += 1
+        if os.path.normpath(dir_path) != os.path.normpath(dest_dir_path) and len(os.listdir(dir_path)) == 0:
+            os.rmdir(dir_path)
+    print(f"Merged {count} shards into {dest_dir_path}: {len(metadata)} pages, {copied} files copied, {removed} removed")
+    return basepath, metadata
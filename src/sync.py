@@ -0,0 +1,86 @@
+import os, shutil
+
+from .manifest import hash_file
+
+FICLONE = 0x40049409 # linux ioctl that makes dest share src's blocks copy-on-write
+
+def reflink(src_path, dest_path):
+    import fcntl
+    with open(src_path, 'rb') as src_file, open(dest_path, 'wb') as dest_file:
+        fcntl.ioctl(dest_file.fileno(), FICLONE, src_file.fileno())
+    shutil.copystat(src_path, dest_path)
+
+# reflink, then hardlink, then a plain copy. dest is always unlinked first, so a hardlinked dest
+# is replaced instead of written through to the source.
+def link_or_copy(src_path, dest_path, link = True):
+    if os.path.lexists(dest_path):
+        os.remove(dest_path)
+    if link:
+        try:
+            reflink(src_path, dest_path)
+            return
+        except (ImportError, OSError):
+            if os.path.lexists(dest_path):
+                os.remove(dest_path)
+        try:
+            os.link(src_path, dest_path)
+            return
+        except OSError:
+            pass
+    shutil.copy2(src_path, dest_path)
+
+def is_up_to_date(src_path, dest_path, use_hash = False):
+    try:
+        dest_stat = os.stat(dest_path)
+    except FileNotFoundError:
+        return False
+    src_stat = os.stat(src_path)
+    if os.path.samestat(src_stat, dest_stat):
+        return True
+    if src_stat.st_size != dest_stat.st_size:
+        return False
+    if src_stat.st_mtime_ns == dest_stat.st_mtime_ns:
+        return True
+    if use_hash and hash_file(src_path) == hash_file(dest_path):
+        # same bytes, align the mtime so the next sync doesn't hash it again
+        os.utime(dest_path, ns=(src_stat.st_atime_ns, src_stat.st_mtime_ns))
+        return True
+    return False
+
+def sync_file(src_path, dest_path, use_hash = False, link = True):
+    if is_up_to_date(src_path, dest_path, use_hash):
+        return False
+    os.makedirs(os.path.dirname(dest_path), exist_ok=True)
+    link_or_copy(src_path, dest_path, link)
+    return True
+
+def is_sibling(path, suffixes, *path_sets):
+    for suffix in suffixes:
+        if path.endswith(suffix) and any(map(lambda paths: path[:-len(suffix)] in paths, path_sets)):
+            return True
+    return False
+
+# Makes dest_dir mirror src_dir, copying only new or changed files. Files under dest_dir
+# that aren't in src_dir are removed unless they're in keep (e.g. the generated pages), or
+# are a copy of such a file with one of the sibling suffixes (e.g. a precompressed .gz).
+def sync_tree(src_dir, dest_dir, keep = (), use_hash = False, link = True, siblings = ()):
+    keep = set(map(os.path.normpath, keep))
+    copied = []
+    expected = set()
+    for dir_path, _, file_names in os.walk(src_dir):
+        for file_name in file_names:
+            src_path = os.path.join(dir_path, file_name)
+            dest_path = os.path.join(dest_dir, os.path.relpath(src_path, src_dir))
+            expected.add(os.path.normpath(dest_path))
+            if sync_file(src_path, dest_path, use_hash, link):
+                copied.append(dest_path)
+    removed = []
+    for dir_path, _, file_names in os.walk(dest_dir, topdown=False):
+        for file_name in file_names:
+            dest_path = os.path.normpath(os.path.join(dir_path, file_name))
+            if dest_path not in expected and dest_path not in keep and not is_sibling(dest_path, siblings, expected, keep):
+                os.remove(dest_path)
+                removed.append(dest_path)
+        if os.path.normpath(dir_path) != os.path.normpath(dest_dir) and len(os.listdir(dir_path)) == 0:
+            os.rmdir(dir_path)
+    return copied, removed
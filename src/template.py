@@ -0,0 +1,94 @@
+import hashlib, re
+
+from .linkgraph import link_target
+from .minify import Minifier
+from .navigation import NAV_SLOTS
+
+SLOT_PATTERN = re.compile(r"\{\{ (\w+) \}\}")
+LINK_PATTERN = re.compile(r'(href|src)="/')
+LINK_URL_PATTERN = re.compile(r'(href|src)="(/[^"]*)"')
+
+# With assets, images get their sizes and static files their fingerprinted names on the way.
+def rewrite_links(html, basepath, assets = None):
+    if '="/' not in html:
+        return html
+    if assets != None:
+        html = assets.add_sizes(html)
+        if assets.fingerprint:
+            return LINK_URL_PATTERN.sub(lambda m: f'{m[1]}="{basepath}{assets.url(m[2])[1:]}"', html)
+    if basepath == "/":
+        return html
+    return LINK_PATTERN.sub(lambda m: f'{m[1]}="{basepath}', html)
+
+class Template:
+    def __init__(self, source, path = None, minify = False, assets = None, navigation = None):
+        self.path = path
+        self.minify = minify
+        self.assets = assets
+        # minified output differs too, so a manifest re-renders every page when the setting changes
+        digest = hashlib.sha256(source.encode() + (b"\0minify" if minify else b""))
+        if assets != None:
+            # and so does the template's own output when an asset it links to changes
+            digest.update(assets.version(map(lambda m: link_target(m[2]), LINK_URL_PATTERN.finditer(source))).encode())
+        self.hash = digest.hexdigest()
+        # even indices are literal text, odd indices are slot names
+        self.parts = SLOT_PATTERN.split(source)
+        # pages only depend on the content tree when there's a slot to put it in
+        self.nav_slots = any(map(lambda name: name in NAV_SLOTS, self.parts[1::2]))
+        self.navigation = navigation if self.nav_slots else None
+        self.__literals = {}
+
+    @classmethod
+    def load(cls, path, minify = False, assets = None, navigation = None):
+        with open(path) as template_file:
+            return cls(template_file.read(), path, minify, assets, navigation)
+
+    def __literals_for(self, basepath):
+        # literal segments only depend on the basepath, so rewrite them once per basepath
+        literals = self.__literals.get(basepath)
+        if literals == None:
+            literals = [rewrite_links(part, basepath, self.assets) for part in self.parts[::2]]
+            self.__literals[basepath] = literals
+        return literals
+
+    def iter_render(self, basepath, slots):
+        if self.minify:
+            return Minifier().iter(self.__iter_fragments(basepath, slots))
+        return self.__iter_fragments(basepath, slots)
+
+    def __iter_fragments(self, basepath, slots):
+        literals = self.__literals_for(basepath)
+        yield literals[0]
+        for i in range(1, len(self.parts), 2):
+            name = self.parts[i]
+            if name not in slots:
+                # unknown slots are left in place, same as an unmatched str.replace
+                yield f"{{{{ {name} }}}}"
+            elif isinstance(slots[name], str):
+                yield rewrite_links(slots[name], basepath, self.assets)
+            else:
+                # an iterable of fragments, each one is rewritten as it streams through
+                for fragment in slots[name]:
+                    yield rewrite_links(fragment, basepath, self.assets)
+            yield literals[(i + 1) // 2]
+
+    # the navigation slots of the page at dest_path
+    def page_slots(self, dest_path):
+        if self.navigation == None:
+            return {}
+        return self.navigation.slots(dest_path)
+
+    def render(self, basepath, **slots):
+        return ''.join(self.iter_render(basepath, slots))
+
+    def write(self, stream, basepath, **slots):
+        stream.writelines(self.iter_render(basepath, slots))
+
+    def __getstate__(self):
+        # workers rebuild their own rewritten literals
+        state = self.__dict__.copy()
+        state["_Template__literals"] = {}
+        return state
+
+    def __repr__(self):
+        return f"Template({self.path}, slots:{self.parts[1::2]})"
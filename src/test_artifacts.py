@@ -0,0 +1,47 @@
+import json, os, unittest
+from xml.etree import ElementTree
+
+from .artifacts import page_url, write_artifacts
+from .test_main import TempDirTestCase
+
+METADATA = {
+    os.path.join("docs", "index.html"): {"source": "content/index.md", "title": "Tolkien Fan Club", "mtime": 1700000000.0, "words": 120},
+    os.path.join("docs", "blog", "tom", "index.html"): {"source": "content/blog/tom/index.md", "title": "Why Tom <3", "mtime": 1710000000.0, "words": 300},
+    os.path.join("docs", "contact.html"): {"source": "content/contact.md", "title": "Contact", "mtime": 1600000000.0, "words": 10},
+}
+
+class TestPageUrl(unittest.TestCase):
+    def test_index_pages_map_to_directories(self):
+        self.assertEqual(page_url(os.path.join("docs", "index.html"), "docs", "/"), "/")
+        self.assertEqual(page_url(os.path.join("docs", "blog", "tom", "index.html"), "docs", "/site/"), "/site/blog/tom/")
+        self.assertEqual(page_url(os.path.join("docs", "contact.html"), "docs", "/"), "/contact.html")
+
+class TestWriteArtifacts(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.metadata = {os.path.join(self.tmp.name, path): meta for path, meta in METADATA.items()}
+        self.dest = os.path.join(self.tmp.name, "docs")
+        os.makedirs(self.dest)
+        write_artifacts(self.metadata, self.dest, "https://example.com/", "/", feed_size=2)
+
+    def test_sitemap(self):
+        namespace = {"s": "http://www.sitemaps.org/schemas/sitemap/0.9"}
+        root = ElementTree.parse(os.path.join(self.dest, "sitemap.xml")).getroot()
+        self.assertListEqual([loc.text for loc in root.findall("s:url/s:loc", namespace)], [
+            "https://example.com/",
+            "https://example.com/blog/tom/",
+            "https://example.com/contact.html",
+        ])
+
+    def test_feed_is_newest_first(self):
+        channel = ElementTree.parse(os.path.join(self.dest, "feed.xml")).getroot().find("channel")
+        self.assertEqual(channel.find("title").text, "Tolkien Fan Club")
+        self.assertListEqual([item.find("title").text for item in channel.findall("item")], ["Why Tom <3", "Tolkien Fan Club"])
+
+    def test_page_index(self):
+        with open(os.path.join(self.dest, "pages.json")) as f:
+            entries = json.load(f)
+        self.assertEqual(entries[1], {"url": "/blog/tom/", "title": "Why Tom <3", "mtime": 1710000000.0, "words": 300})
+
+if __name__ == "__main__":
+    unittest.main()
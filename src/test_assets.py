@@ -0,0 +1,101 @@
+import os, struct, unittest
+from contextlib import redirect_stdout
+from io import StringIO
+from unittest import mock
+
+from .assets import AssetMap, fingerprint_url, image_size, scan_assets
+from .main import find_pages, generate_pages_incremental
+from .template import Template
+from .test_main import TempDirTestCase
+
+PNG = b"\x89PNG\r\n\x1a\n\x00\x00\x00\x0dIHDR" + struct.pack(">II", 640, 480) + b"\x08\x06\x00\x00\x00"
+GIF = b"GIF89a" + struct.pack("<HH", 5, 7) + b"\x00" * 10
+# an exif segment full of 0xff bytes, a padded marker and then the frame header
+JPEG = b"\xff\xd8\xff\xe1\x00\x08\xff\xff\xff\xc0\x00\x01\xff\xff\xc0\x00\x11\x08" + struct.pack(">HH", 32, 48) + b"\x03" + b"\x00" * 9 + b"\xff\xd9"
+
+class AssetTestCase(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.static = os.path.join(self.tmp.name, "static")
+        self.cache = os.path.join(self.tmp.name, "assets.json")
+        self.write(os.path.join(self.static, "images", "tom.png"), PNG)
+        self.write(os.path.join(self.static, "index.css"), b"body {}")
+        self.write(os.path.join(self.static, "robots.txt"), b"")
+
+class TestImageSize(AssetTestCase):
+    def test_headers(self):
+        for name, data, size in [("a.png", PNG, (640, 480)), ("a.gif", GIF, (5, 7)), ("a.jpg", JPEG, (48, 32)), ("a.txt", b"text", None)]:
+            path = os.path.join(self.tmp.name, name)
+            self.write(path, data)
+            self.assertEqual(image_size(path), size)
+
+    def test_truncated_headers(self):
+        for name, data in [("a.jpg", JPEG[:20]), ("a.png", PNG[:20]), ("a.gif", GIF[:8])]:
+            path = os.path.join(self.tmp.name, name)
+            self.write(path, data)
+            self.assertIsNone(image_size(path))
+
+class TestAssetMap(AssetTestCase):
+    def test_fingerprint_url(self):
+        self.assertEqual(fingerprint_url("/css/index.css?v=1#top", "0123456789abcdef"), "/css/index.0123456789.css?v=1#top")
+
+    def test_scan_reuses_cache(self):
+        assets = scan_assets(self.static, self.cache)
+        self.assertListEqual(sorted(assets), ["/images/tom.png", "/index.css"])
+        self.assertEqual(assets["/images/tom.png"][3:], [640, 480])
+        # same size and mtime, so the file isn't read again
+        css = os.path.join(self.static, "index.css")
+        stat = os.stat(css)
+        self.write(css, b"html {}")
+        os.utime(css, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+        self.assertEqual(scan_assets(self.static, self.cache), assets)
+
+    def test_sizes_only_read_when_used(self):
+        self.write(os.path.join(self.static, "broken.png"), PNG[:20])
+        with mock.patch("src.assets.image_size", side_effect=AssertionError("image was read")):
+            assets = scan_assets(self.static, self.cache, sizes=False)
+        self.assertEqual(len(assets["/images/tom.png"]), 3)
+        # the hashes are reused, only the sizes are added
+        self.assertEqual(scan_assets(self.static, self.cache)["/images/tom.png"], assets["/images/tom.png"] + [640, 480])
+        self.assertEqual(scan_assets(self.static, self.cache)["/broken.png"][3:], [None, None])
+
+    def test_rewrite_links(self):
+        assets = AssetMap(self.static, self.cache)
+        digest = assets.assets["/images/tom.png"][2][:10]
+        html = '<p><img src="/images/tom.png" alt="tom"></img><img src="/other.png" alt="x"></img><a href="/blog">blog</a></p>'
+        self.assertEqual(Template("{{ Content }}", assets=assets).render("/site/", Content=html),
+            f'<p><img src="/site/images/tom.{digest}.png" width="640" height="480" alt="tom"></img><img src="/site/other.png" alt="x"></img><a href="/site/blog">blog</a></p>')
+
+    def test_sizes_only(self):
+        assets = AssetMap(self.static, self.cache, fingerprint=False)
+        template = Template("{{ Content }}", assets=assets)
+        self.assertEqual(template.render("/", Content='<img src="/images/tom.png">'), '<img src="/images/tom.png" width="640" height="480">')
+        self.assertEqual(template.render("/", Content='<img width="1" src="/images/tom.png">'), '<img width="1" src="/images/tom.png">')
+        self.assertListEqual(assets.copies("docs"), [])
+
+    def test_copies(self):
+        assets = AssetMap(self.static, self.cache)
+        self.assertListEqual(list(map(lambda copy: os.path.basename(copy[1]).split('.')[0], assets.copies("docs"))), ["tom", "index"])
+
+    def test_incremental_rerenders_pages_linking_to_changed_assets(self):
+        content = os.path.join(self.tmp.name, "content")
+        dest = os.path.join(self.tmp.name, "docs")
+        manifest = os.path.join(self.tmp.name, "manifest.json")
+        self.write(os.path.join(content, "index.md"), b"# Home\n\n![tom](/images/tom.png)")
+        self.write(os.path.join(content, "other.md"), b"# Other\n\ntext")
+        def build():
+            template = Template('<link href="/index.css">{{ Content }}', "template.html", assets=AssetMap(self.static, self.cache))
+            with redirect_stdout(StringIO()):
+                return list(map(lambda page: os.path.basename(page[1]), generate_pages_incremental(find_pages(content, dest), template, dest, "/", manifest)[0]))
+        self.assertListEqual(sorted(build()), ["index.html", "other.html"])
+        self.assertListEqual(build(), [])
+        self.write(os.path.join(self.static, "images", "tom.png"), PNG[:16] + struct.pack(">II", 64, 48) + PNG[24:] + b"\x00")
+        self.assertListEqual(build(), ["index.html"])
+        with open(os.path.join(dest, "index.html")) as f:
+            self.assertIn('width="64" height="48"', f.read())
+        # the template links to index.css, so every page depends on it
+        self.write(os.path.join(self.static, "index.css"), b"html { }")
+        self.assertListEqual(sorted(build()), ["index.html", "other.html"])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,45 @@
+import asyncio, os, unittest
+from contextlib import redirect_stdout
+from io import StringIO
+
+from .asyncbuild import generate_pages_async
+from .main import BuildError, find_pages, generate_pages
+from .template import Template
+from .test_main import TempDirTestCase
+
+class TestAsyncBuild(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.content = os.path.join(self.tmp.name, "content")
+        self.dest = os.path.join(self.tmp.name, "docs")
+        for i in range(12):
+            self.write(os.path.join(self.content, f"section{i % 3}", "nested", f"page{i}.md"), f"# Page {i}\n\nText with a [link](/page{i}) and **bold**\n\n1. one\n2. two")
+        self.template = Template('<title>{{ Title }}</title><link href="/index.css">{{ Content }}')
+
+    def outputs(self, pages):
+        return {dest: self.read(dest) for _, dest in pages}
+
+    def test_matches_serial_build(self):
+        pages = find_pages(self.content, self.dest)
+        with redirect_stdout(StringIO()):
+            generate_pages(pages, self.template, "/site/")
+            expected = self.outputs(pages)
+            failures, metadata = asyncio.run(generate_pages_async(pages, self.template, "/site/", readers=3, writers=2, queue_depth=2))
+        self.assertListEqual(failures, [])
+        self.assertDictEqual(self.outputs(pages), expected)
+        self.assertEqual(len(metadata), 12)
+
+    def test_failures_name_the_source(self):
+        broken = os.path.join(self.content, "broken.md")
+        self.write(broken, "no title")
+        missing = os.path.join(self.content, "missing.md")
+        pages = find_pages(self.content, self.dest) + [(missing, os.path.join(self.dest, "missing.html"))]
+        with redirect_stdout(StringIO()):
+            with self.assertRaises(BuildError) as context:
+                generate_pages(pages, self.template, "/", io_workers=2)
+        self.assertListEqual([path for path, _ in context.exception.failures], [broken, missing])
+        self.assertFalse(os.path.exists(os.path.join(self.dest, "broken.html")))
+        self.assertEqual(len(os.listdir(os.path.join(self.dest, "section0", "nested"))), 4)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,82 @@
+import os, subprocess, sys, unittest
+from contextlib import redirect_stdout
+from io import StringIO
+from unittest import mock
+
+from .builder import Site
+from .test_main import SiteTestCase
+
+class TestSite(SiteTestCase):
+    def setUp(self):
+        super().setUp()
+        self.write(os.path.join(self.tmp.name, "static", "index.css"), "body {}")
+        self.site = Site(self.tmp.name, "/site/")
+
+    def build(self, changed_paths = None):
+        with redirect_stdout(StringIO()):
+            return self.site.build(changed_paths)
+
+    def test_render_page_matches_build(self):
+        self.build()
+        self.assertEqual(self.site.render_page(os.path.join("blog", "post.md")), self.read(os.path.join(self.dest, "blog", "post.html")))
+
+    def test_full_build(self):
+        metadata = self.build()
+        self.assertSetEqual(set(metadata), {os.path.join(self.dest, "index.html"), os.path.join(self.dest, "blog", "post.html")})
+        self.assertTrue(os.path.isfile(os.path.join(self.dest, "index.css")))
+
+    def test_changed_paths_only(self):
+        self.build()
+        post = os.path.join(self.content, "blog", "post.md")
+        new = os.path.join(self.content, "new.md")
+        self.write(post, "# Post\n\nedited")
+        self.write(new, "# New\n\npage")
+        os.remove(os.path.join(self.content, "index.md"))
+        metadata = self.build([post, new, os.path.join(self.content, "index.md")])
+        self.assertSetEqual(set(metadata), {os.path.join(self.dest, "blog", "post.html"), os.path.join(self.dest, "new.html")})
+        self.assertFalse(os.path.exists(os.path.join(self.dest, "index.html")))
+        self.assertIn("<p>edited</p>", self.read(os.path.join(self.dest, "blog", "post.html")))
+        self.assertSetEqual(set(self.site.metadata), set(metadata))
+
+    def test_template_change_renders_every_page(self):
+        self.build()
+        self.write(self.template, "<main>{{ Content }}</main>")
+        metadata = self.build([self.template])
+        self.assertEqual(len(metadata), 2)
+        self.assertTrue(self.read(os.path.join(self.dest, "index.html")).startswith("<main>"))
+        self.assertTrue(self.site.render_page("index.md").startswith("<main>"))
+
+    def test_tree_not_read_without_navigation(self):
+        with mock.patch("src.builder.scan_content", side_effect=AssertionError("content tree was read")):
+            site = Site(self.tmp.name, "/site/")
+            self.assertIn("<b>bold</b>", site.render_page(os.path.join("blog", "post.md")))
+
+    def test_render_page_fills_navigation(self):
+        self.write(self.template, "<nav>{{ Breadcrumbs }}{{ Siblings }}</nav>{{ Content }}")
+        self.site = Site(self.tmp.name, "/site/")
+        self.build()
+        post = self.site.render_page(os.path.join("blog", "post.md"))
+        self.assertEqual(post, self.read(os.path.join(self.dest, "blog", "post.html")))
+        self.assertIn('<li aria-current="page">post</li>', post)
+
+    def test_added_page_renders_every_page_with_navigation(self):
+        self.write(self.template, "<nav>{{ Navigation }}</nav>{{ Content }}")
+        self.site = Site(self.tmp.name, "/site/")
+        self.build()
+        new = os.path.join(self.content, "new.md")
+        self.write(new, "# New\n\npage")
+        self.assertEqual(len(self.build([new])), 3)
+        self.assertIn('href="/site/new.html"', self.read(os.path.join(self.dest, "index.html")))
+        os.remove(new)
+        self.assertEqual(len(self.build([new])), 2)
+        self.assertNotIn("new.html", self.read(os.path.join(self.dest, "index.html")))
+
+    def test_import_has_no_side_effects(self):
+        # the CLI's argument parsing, process pool and asyncio stay out of embedding callers, and so
+        # do top level modules named after the package's own
+        code = "import sys, src.builder; print(sorted(name for name in ['argparse', 'asyncio', 'concurrent.futures', 'src.main', 'builder', 'template'] if name in sys.modules))"
+        result = subprocess.run([sys.executable, "-c", code], cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))), capture_output=True, text=True, check=True)
+        self.assertEqual(result.stdout.strip(), "[]")
+
+if __name__ == "__main__":
+    unittest.main()
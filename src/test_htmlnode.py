@@ -1,7 +1,10 @@
 import unittest
+from io import StringIO
 
-from htmlnode import HTMLNode, ParentNode, LeafNode, text_node_to_html_node, markdown_to_html_node
-from textnode import TextNode, TextType
+from .htmlnode import HTMLNode, ParentNode, LeafNode, text_node_to_html_node, markdown_to_html_node, iter_markdown_html
+from .rendercache import RenderCache
+from .texthandling import WordCounter, markdown_to_blocks
+from .textnode import TextNode, TextType
 
 class TestHTMLNode(unittest.TestCase):
     def test_all_none(self):
@@ -15,16 +18,28 @@ class TestHTMLNode(unittest.TestCase):
         node = HTMLNode(props={"href": "https://www.google.com", "target": "_blank"})
         self.assertEqual(node.props_to_html(), "href=\"https://www.google.com\" target=\"_blank\"")
 
+    def test_props_are_escaped(self):
+        node = HTMLNode(props={"href": "/search?q=a&b=\"c\"", "title": "<x>"})
+        self.assertEqual(node.props_to_html(), "href=\"/search?q=a&amp;b=&quot;c&quot;\" title=\"&lt;x&gt;\"")
+
     def test_to_html_exception(self):
         with self.assertRaises(NotImplementedError):
             HTMLNode().to_html()
 
+    def test_no_instance_dict(self):
+        for node in [HTMLNode(), ParentNode("p", []), LeafNode("b", "x")]:
+            self.assertFalse(hasattr(node, "__dict__"))
+
 class TestParentNode(unittest.TestCase):
     def test_to_html_with_children(self):
         child_node = LeafNode("span", "child")
         parent_node = ParentNode("div", [child_node])
         self.assertEqual(parent_node.to_html(), "<div><span>child</span></div>")
 
+    def test_to_html_with_props(self):
+        parent_node = ParentNode("div", [LeafNode(None, "x")], {"class": "note"})
+        self.assertEqual(parent_node.to_html(), "<div class=\"note\">x</div>")
+
     def test_to_html_with_grandchildren(self):
         grandchild_node = LeafNode("b", "grandchild")
         child_node = ParentNode("span", [grandchild_node])
@@ -47,6 +62,21 @@ class TestParentNode(unittest.TestCase):
         with self.assertRaises(ValueError):
             ParentNode("a", None).to_html()
 
+    def test_deep_nesting(self):
+        node = LeafNode("b", "deep")
+        for _ in range(10000):
+            node = ParentNode("span", [node])
+        html = node.to_html()
+        self.assertTrue(html.startswith("<span>" * 10000 + "<b>deep</b></span>"))
+        self.assertEqual(len(html), 10000 * len("<span></span>") + len("<b>deep</b>"))
+
+    def test_write_html(self):
+        node = ParentNode("div", [ParentNode("p", [LeafNode(None, "a "), LeafNode("a", "b", {"href": "/c"})]), LeafNode("hr", "")])
+        stream = StringIO()
+        node.write_html(stream)
+        self.assertEqual(stream.getvalue(), "<div><p>a <a href=\"/c\">b</a></p><hr></hr></div>")
+        self.assertEqual(''.join(node.iter_html()), node.to_html())
+
 class TestLeafNode(unittest.TestCase):
     def test_leaf_to_html_p(self):
         node = LeafNode("p", "Hello, world!")
@@ -64,6 +94,10 @@ class TestLeafNode(unittest.TestCase):
         node = LeafNode("a", "google", {"href": "https://www.google.com"})
         self.assertEqual(node.to_html(), "<a href=\"https://www.google.com\">google</a>")
 
+    def test_value_is_escaped(self):
+        self.assertEqual(LeafNode("code", "a < b && c > \"d\"").to_html(), "<code>a &lt; b &amp;&amp; c &gt; \"d\"</code>")
+        self.assertEqual(LeafNode(None, "<script>").to_html(), "&lt;script&gt;")
+
 class TestTextToHTML(unittest.TestCase):
     def test_text(self):
         node = TextNode("This is a text node", TextType.TEXT)
@@ -127,5 +161,24 @@ the **same** even with inline stuff
             "<div><pre><code>This is text that _should_ remain\nthe **same** even with inline stuff\n</code></pre></div>",
         )
 
+class TestIterMarkdownHTML(unittest.TestCase):
+    def test_matches_to_html(self):
+        md = "# Title\n\nSome **bold** [link](/a)\n\n```\ncode\n```\n\n> quote\n\n1. one\n2. two"
+        self.assertEqual(''.join(iter_markdown_html(markdown_to_blocks(md))), markdown_to_html_node(md).to_html())
+
+    def test_no_blocks(self):
+        with self.assertRaises(ValueError):
+            list(iter_markdown_html([]))
+
+    def test_words_are_counted_in_rendered_text(self):
+        md = "# Renamed Post\n\n- one\n- **two**\n\n1. three\n\n> four [five](/a/long/url)\n\n```\nsix\n```"
+        cache = RenderCache()
+        # rendered, rendered into the cache, then served from it
+        for cache in [None, cache, cache]:
+            words = WordCounter()
+            list(iter_markdown_html(markdown_to_blocks(md), cache, [words]))
+            self.assertEqual(words.count, 8)
+        self.assertEqual(cache.hits, 5)
+
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
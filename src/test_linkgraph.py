@@ -0,0 +1,60 @@
+import os, re, unittest
+
+from .htmlnode import iter_markdown_html
+from .linkgraph import LinkCollector, LinkGraph, link_target, path_targets
+from .test_main import TempDirTestCase
+
+class TestLinkTarget(unittest.TestCase):
+    def test_internal_links(self):
+        self.assertEqual(link_target("/blog/tom#intro"), "/blog/tom")
+        self.assertEqual(link_target("/search?q=x"), "/search")
+        self.assertEqual(link_target("/images/a%20b.png"), "/images/a b.png")
+
+    def test_external_links(self):
+        self.assertIsNone(link_target("https://example.com/x"))
+        self.assertIsNone(link_target("//cdn.example.com/x.js"))
+        self.assertIsNone(link_target("relative/page"))
+
+class TestLinkCollector(unittest.TestCase):
+    def test_collects_links_and_images(self):
+        blocks = ["# Title", "See [tom](/blog/tom) and ![map](/images/map.png)", "- [out](https://example.com)", "```\n[not](/a/link)\n```", "Not a link: [half](/open"]
+        links = LinkCollector()
+        list(iter_markdown_html(blocks, None, [links]))
+        self.assertSetEqual(links.links, {"/blog/tom", "/images/map.png"})
+
+    def test_collects_what_is_rendered(self):
+        # whatever the inline tokenizer turns into an <a> or <img> is a link of the page, nothing else is
+        blocks = ["Write `[x](/code)` and `y` then [z](/after)", "> quoted [q](/quote) text"]
+        links = LinkCollector()
+        html = ''.join(iter_markdown_html(blocks, None, [links]))
+        self.assertSetEqual(links.links, set(re.findall(r'(?:href|src)="([^"]*)"', html)))
+
+
+class TestLinkGraph(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.dest = self.tmp.name
+        self.write(os.path.join(self.dest, "images", "map.png"), "")
+        self.metadata = {
+            os.path.join(self.dest, "index.html"): {"links": ["/blog/tom/", "/contact", "/images/map.png"]},
+            os.path.join(self.dest, "blog", "tom", "index.html"): {"links": ["/", "/images/gone.png"]},
+            os.path.join(self.dest, "contact.html"): {"links": []},
+        }
+
+    def test_path_targets(self):
+        self.assertSetEqual(path_targets(os.path.join(self.dest, "blog", "tom", "index.html"), self.dest), {"/blog/tom", "/blog/tom/", "/blog/tom/index", "/blog/tom/index.html"})
+
+    def test_broken_links(self):
+        graph = LinkGraph(self.metadata, self.dest)
+        self.assertListEqual(graph.broken_links(), [(os.path.join(self.dest, "blog", "tom", "index.html"), "/images/gone.png")])
+        self.assertListEqual(graph.broken_links([os.path.join(self.dest, "index.html")]), [])
+
+    def test_dependents(self):
+        del self.metadata[os.path.join(self.dest, "contact.html")]
+        graph = LinkGraph(self.metadata, self.dest)
+        self.assertListEqual(graph.dependents([os.path.join(self.dest, "contact.html")]), [os.path.join(self.dest, "index.html")])
+        self.assertListEqual(graph.dependents([os.path.join(self.dest, "other.html")]), [])
+        self.assertListEqual(graph.broken_links(graph.dependents([os.path.join(self.dest, "contact.html")])), [(os.path.join(self.dest, "index.html"), "/contact")])
+
+if __name__ == "__main__":
+    unittest.main()
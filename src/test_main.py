@@ -0,0 +1,231 @@
+import gzip, os, tempfile, unittest
+from contextlib import redirect_stdout
+from io import StringIO
+from unittest import mock
+
+from .main import BuildError, check_links, find_pages, generate_page, generate_pages_incremental, generate_pages_recursive, rebuild_changed
+from .htmlnode import markdown_to_html_node
+from .texthandling import extract_title
+
+TEMPLATE = '<html><title>{{ Title }}</title><link href="/index.css"><body>{{ Content }}</body></html>'
+
+# a temporary directory per test, with helpers for the files in it
+class TempDirTestCase(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, path, data):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, 'wb' if isinstance(data, bytes) else 'w') as f:
+            f.write(data)
+
+    def read(self, path):
+        with open(path) as f:
+            return f.read()
+
+class SiteTestCase(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.content = os.path.join(self.tmp.name, "content")
+        self.dest = os.path.join(self.tmp.name, "docs")
+        self.template = os.path.join(self.tmp.name, "template.html")
+        self.manifest = os.path.join(self.tmp.name, "manifest.json")
+        self.write(self.template, TEMPLATE)
+        self.write(os.path.join(self.content, "index.md"), "# Home\n\n[blog](/blog/post)")
+        self.write(os.path.join(self.content, "blog", "post.md"), "# Post\n\nSome **bold** text")
+
+    def incremental(self, basepath = "/"):
+        with redirect_stdout(StringIO()):
+            return generate_pages_incremental(find_pages(self.content, self.dest), self.template, self.dest, basepath, self.manifest)
+
+class TestFindPages(SiteTestCase):
+    def test_find_pages(self):
+        self.assertListEqual(sorted(find_pages(self.content, self.dest)), sorted([
+            (os.path.join(self.content, "index.md"), os.path.join(self.dest, "index.html")),
+            (os.path.join(self.content, "blog", "post.md"), os.path.join(self.dest, "blog", "post.html")),
+        ]))
+
+class TestGeneratePage(SiteTestCase):
+    def test_matches_in_memory_render(self):
+        source = os.path.join(self.content, "index.md")
+        dest = os.path.join(self.dest, "index.html")
+        with redirect_stdout(StringIO()):
+            generate_page(source, self.template, dest, "/site/")
+        markdown = self.read(source)
+        expected = TEMPLATE.replace('{{ Title }}', extract_title(markdown)).replace('{{ Content }}', markdown_to_html_node(markdown).to_html()).replace('href="/', 'href="/site/').replace('src="/', 'src="/site/')
+        self.assertEqual(self.read(dest), expected)
+
+    def test_title_is_escaped(self):
+        source = os.path.join(self.content, "index.md")
+        dest = os.path.join(self.dest, "index.html")
+        self.write(source, "# Tom & Jerry <3\n\ntext")
+        with redirect_stdout(StringIO()):
+            metadata = generate_page(source, self.template, dest, "/")
+        self.assertIn("<title>Tom &amp; Jerry &lt;3</title>", self.read(dest))
+        self.assertEqual(metadata["title"], "Tom & Jerry <3")
+
+    def test_mapped_source_matches_line_reader(self):
+        source = os.path.join(self.content, "big.md")
+        self.write(source, "# Big\n\n" + "\n\n".join(f"paragraph {i} with **bold** and [a link](/page/{i})" for i in range(200)) + "\n\n```\ncode\n\nblock\n```\n")
+        outputs = []
+        for threshold in [2**62, 1]:
+            dest = os.path.join(self.dest, f"big{threshold}.html")
+            with mock.patch("src.builder.MMAP_THRESHOLD", threshold), redirect_stdout(StringIO()):
+                metadata = generate_page(source, self.template, dest, "/")
+            outputs.append((self.read(dest), metadata))
+        self.assertEqual(outputs[0], outputs[1])
+
+    def test_crlf_source_uses_line_reader(self):
+        source = os.path.join(self.content, "crlf.md")
+        with open(source, 'wb') as f:
+            f.write(b"# CRLF\r\n\r\nfirst\r\n\r\nsecond\r\n")
+        dest = os.path.join(self.dest, "crlf.html")
+        with mock.patch("src.builder.MMAP_THRESHOLD", 1), redirect_stdout(StringIO()):
+            generate_page(source, self.template, dest, "/")
+        self.assertIn("<div><h1>CRLF</h1><p>first</p><p>second</p></div>", self.read(dest))
+
+    def test_mixed_line_endings_match_line_reader(self):
+        source = os.path.join(self.content, "mixed.md")
+        with open(source, 'wb') as f:
+            f.write(b"# Mixed\n\nfirst\r\n\r\nsecond\r\nline\n\n- a\r\n- b\r\n")
+        outputs = []
+        for threshold in [2**62, 1]:
+            dest = os.path.join(self.dest, f"mixed{threshold}.html")
+            with mock.patch("src.builder.MMAP_THRESHOLD", threshold), redirect_stdout(StringIO()):
+                generate_page(source, self.template, dest, "/")
+            outputs.append(self.read(dest))
+        self.assertEqual(outputs[0], outputs[1])
+        self.assertIn("<p>first</p><p>second line</p><ul><li>a</li><li>b</li></ul>", outputs[1])
+
+    def test_failure_keeps_previous_page(self):
+        source = os.path.join(self.content, "index.md")
+        dest = os.path.join(self.dest, "index.html")
+        self.write(dest, "previous")
+        self.write(source, "no title here")
+        with self.assertRaises(Exception):
+            with redirect_stdout(StringIO()):
+                generate_page(source, self.template, dest, "/")
+        self.assertEqual(self.read(dest), "previous")
+        self.assertListEqual(os.listdir(self.dest), ["index.html"])
+
+class TestParallelBuild(SiteTestCase):
+    def build(self, jobs):
+        with redirect_stdout(StringIO()):
+            generate_pages_recursive(self.content, self.template, self.dest, "/site/", jobs)
+        return {dest: self.read(dest) for _, dest in find_pages(self.content, self.dest)}
+
+    def test_matches_serial_build(self):
+        for i in range(10):
+            self.write(os.path.join(self.content, "many", f"page{i}.md"), f"# Page {i}\n\n- item _{i}_")
+        self.assertDictEqual(self.build(4), self.build(1))
+
+    def test_errors_name_the_source(self):
+        broken = os.path.join(self.content, "broken.md")
+        self.write(broken, "no title here")
+        with self.assertRaises(BuildError) as context:
+            self.build(2)
+        self.assertListEqual([path for path, _ in context.exception.failures], [broken])
+        self.assertIn(broken, str(context.exception))
+
+class TestIncrementalBuild(SiteTestCase):
+    def test_matches_full_build(self):
+        self.incremental("/site/")
+        incremental_html = self.read(os.path.join(self.dest, "index.html"))
+        with redirect_stdout(StringIO()):
+            generate_pages_recursive(self.content, self.template, self.dest, "/site/")
+        self.assertEqual(incremental_html, self.read(os.path.join(self.dest, "index.html")))
+
+    def test_only_changed_pages_rebuild(self):
+        self.assertEqual(len(self.incremental()[0]), 2)
+        self.assertEqual(len(self.incremental()[0]), 0)
+        self.write(os.path.join(self.content, "blog", "post.md"), "# Post\n\nEdited")
+        to_render, _, _ = self.incremental()
+        self.assertListEqual([dest for _, dest in to_render], [os.path.join(self.dest, "blog", "post.html")])
+        self.assertIn("Edited", self.read(os.path.join(self.dest, "blog", "post.html")))
+
+    def test_template_change_rebuilds_everything(self):
+        self.incremental()
+        self.write(self.template, TEMPLATE.replace("<body>", "<body class=\"x\">"))
+        self.assertEqual(len(self.incremental()[0]), 2)
+
+    def test_metadata_kept_for_skipped_pages(self):
+        self.incremental()
+        self.write(os.path.join(self.content, "blog", "post.md"), "# Renamed Post\n\none two three")
+        to_render, _, metadata = self.incremental()
+        self.assertEqual(len(to_render), 1)
+        self.assertEqual(metadata[os.path.join(self.dest, "index.html")]["title"], "Home")
+        self.assertEqual(metadata[os.path.join(self.dest, "blog", "post.html")]["title"], "Renamed Post")
+        self.assertEqual(metadata[os.path.join(self.dest, "blog", "post.html")]["words"], 5)
+
+    def test_removed_page_flags_only_linking_pages(self):
+        self.write(os.path.join(self.content, "other.md"), "# Other\n\n[nowhere](/missing)")
+        self.incremental()
+        os.remove(os.path.join(self.content, "blog", "post.md"))
+        to_render, removed, metadata = self.incremental()
+        with redirect_stdout(StringIO()):
+            broken = check_links(metadata, self.dest, map(lambda page: page[1], to_render), removed)
+        # other.html wasn't re-rendered and doesn't link to the removed page, so it isn't revisited
+        self.assertListEqual(broken, [(os.path.join(self.dest, "index.html"), "/blog/post")])
+        with redirect_stdout(StringIO()):
+            self.assertEqual(len(check_links(metadata, self.dest)), 2)
+
+    def test_removed_source_deletes_output(self):
+        self.incremental()
+        os.remove(os.path.join(self.content, "blog", "post.md"))
+        _, removed, _ = self.incremental()
+        self.assertListEqual(removed, [os.path.join(self.dest, "blog", "post.html")])
+        self.assertFalse(os.path.exists(os.path.join(self.dest, "blog")))
+
+class TestRebuildChanged(SiteTestCase):
+    def setUp(self):
+        super().setUp()
+        self.static = os.path.join(self.tmp.name, "static")
+        self.write(os.path.join(self.static, "index.css"), "body {}")
+        with redirect_stdout(StringIO()):
+            generate_pages_recursive(self.content, self.template, self.dest, "/")
+
+    def rebuild(self, changed, removed = [], **options):
+        with redirect_stdout(StringIO()) as output:
+            rebuild_changed(changed, removed, self.content, self.static, self.template, self.dest, "/", **options)
+        return output.getvalue()
+
+    def test_changed_page_only(self):
+        post = os.path.join(self.content, "blog", "post.md")
+        self.write(post, "# Post\n\nEdited")
+        output = self.rebuild([post])
+        self.assertEqual(output.count("Generating page"), 1)
+        self.assertIn("Edited", self.read(os.path.join(self.dest, "blog", "post.html")))
+
+    def test_gzip_follows_changed_page(self):
+        options = {"gzip": True, "compress_manifest_path": os.path.join(self.tmp.name, "compress.json")}
+        post = os.path.join(self.content, "blog", "post.md")
+        self.rebuild([post], **options)
+        self.write(post, "# Post\n\nEdited")
+        self.rebuild([post], **options)
+        page = os.path.join(self.dest, "blog", "post.html")
+        with gzip.open(page + ".gz", 'rt') as f:
+            self.assertEqual(f.read(), self.read(page))
+        self.assertIn("Edited", self.read(page))
+
+    def test_template_rebuilds_everything(self):
+        self.write(self.template, TEMPLATE.replace("<body>", "<body class=\"x\">"))
+        self.assertEqual(self.rebuild([self.template]).count("Generating page"), 2)
+
+    def test_static_file_copied_alone(self):
+        css = os.path.join(self.static, "index.css")
+        output = self.rebuild([css])
+        self.assertNotIn("Generating page", output)
+        self.assertEqual(self.read(os.path.join(self.dest, "index.css")), "body {}")
+
+    def test_removed_files(self):
+        post = os.path.join(self.content, "blog", "post.md")
+        os.remove(post)
+        self.rebuild([], [post])
+        self.assertFalse(os.path.exists(os.path.join(self.dest, "blog")))
+        self.assertTrue(os.path.exists(os.path.join(self.dest, "index.html")))
+
+if __name__ == "__main__":
+    unittest.main()
\ No newline at end of file
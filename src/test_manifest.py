@@ -0,0 +1,68 @@
+import os, unittest
+from unittest import mock
+
+from .manifest import Manifest, hash_file
+from .test_main import TempDirTestCase
+
+class TestManifest(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.dir = self.tmp.name
+        self.source = os.path.join(self.dir, "index.md")
+        self.dest = os.path.join(self.dir, "index.html")
+        self.write(self.source, "# Hello")
+        self.write(self.dest, "<h1>Hello</h1>")
+
+    def test_new_page_is_rendered(self):
+        to_render, removed = Manifest().plan([(self.source, self.dest)], "t", "/")
+        self.assertListEqual(to_render, [(self.source, self.dest)])
+        self.assertListEqual(removed, [])
+
+    def test_unchanged_page_is_skipped(self):
+        manifest = Manifest()
+        manifest.plan([(self.source, self.dest)], "t", "/")
+        to_render, _ = manifest.plan([(self.source, self.dest)], "t", "/")
+        self.assertListEqual(to_render, [])
+
+    def test_changed_source_is_rendered(self):
+        manifest = Manifest()
+        manifest.plan([(self.source, self.dest)], "t", "/")
+        self.write(self.source, "# Hello there")
+        to_render, _ = manifest.plan([(self.source, self.dest)], "t", "/")
+        self.assertListEqual(to_render, [(self.source, self.dest)])
+
+    def test_template_or_basepath_change_rerenders(self):
+        manifest = Manifest()
+        manifest.plan([(self.source, self.dest)], "t", "/")
+        self.assertEqual(len(manifest.plan([(self.source, self.dest)], "t2", "/")[0]), 1)
+        self.assertEqual(len(manifest.plan([(self.source, self.dest)], "t2", "/blog/")[0]), 1)
+
+    def test_renderer_change_rerenders(self):
+        manifest = Manifest()
+        manifest.plan([(self.source, self.dest)], "t", "/")
+        with mock.patch("src.manifest.renderer_fingerprint", return_value="new renderer"):
+            self.assertEqual(len(manifest.plan([(self.source, self.dest)], "t", "/")[0]), 1)
+
+    def test_removed_source(self):
+        manifest = Manifest()
+        manifest.plan([(self.source, self.dest)], "t", "/")
+        to_render, removed = manifest.plan([], "t", "/")
+        self.assertListEqual(to_render, [])
+        self.assertListEqual(removed, [self.dest])
+
+    def test_save_and_load(self):
+        manifest_path = os.path.join(self.dir, "manifest.json")
+        manifest = Manifest()
+        manifest.plan([(self.source, self.dest)], hash_file(self.source), "/")
+        manifest.save(manifest_path)
+        loaded = Manifest.load(manifest_path)
+        self.assertDictEqual(loaded.pages, manifest.pages)
+        self.assertDictEqual(loaded.sources, manifest.sources)
+
+    def test_corrupt_manifest_loads_empty(self):
+        manifest_path = os.path.join(self.dir, "manifest.json")
+        self.write(manifest_path, "not json")
+        self.assertDictEqual(Manifest.load(manifest_path).pages, {})
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,32 @@
+import unittest
+
+from .minify import Minifier, minify
+
+class TestMinify(unittest.TestCase):
+    def test_collapses_whitespace_runs(self):
+        self.assertEqual(minify("<div>\n    <p>a   b</p>\n\n  <p>c</p>\n</div>\n"), "<div>\n<p>a b</p>\n<p>c</p>\n</div>\n")
+
+    def test_keeps_space_between_inline_elements(self):
+        self.assertEqual(minify("<b>bold</b>  <i>italic</i>"), "<b>bold</b> <i>italic</i>")
+
+    def test_pre_is_left_alone(self):
+        html = "<div>\n  <pre><code>def f():\n    return  1\n\n</code></pre>\n  </div>"
+        self.assertEqual(minify(html), "<div>\n<pre><code>def f():\n    return  1\n\n</code></pre>\n</div>")
+
+    def test_script_and_textarea_are_left_alone(self):
+        html = '<script>\n  if (a  <  b) {}\n</script>  <textarea>\n  x  </textarea>'
+        self.assertEqual(minify(html), html.replace("</script>  <", "</script> <"))
+
+    def test_drops_comments_but_not_conditional_ones(self):
+        self.assertEqual(minify("a<!-- note\n -->b<!--[if IE]>x<![endif]-->"), "ab<!--[if IE]>x<![endif]-->")
+
+    def test_nbsp_is_content(self):
+        self.assertEqual(minify("a\xa0\xa0 b"), "a\xa0\xa0 b")
+
+    def test_fragments_match_whole_document(self):
+        html = "<p>a  </p>\n  <pre>x\n\n  y</pre>  \n<p>  b</p>"
+        fragments = ["<p>a ", " </p>\n", "  <pre>x\n", "\n  y</pre>", "  ", "\n<p>  b</p>"]
+        self.assertEqual(''.join(Minifier().iter(fragments)), minify(html))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,76 @@
+import os, unittest
+from contextlib import redirect_stdout
+from io import StringIO
+
+from .main import generate_pages_incremental, generate_pages_recursive
+from .navigation import Navigation, scan_content
+from .template import Template
+from .test_main import TempDirTestCase
+
+TEMPLATE = "<nav>{{ Navigation }}</nav><ol>{{ Breadcrumbs }}</ol><aside>{{ Siblings }}</aside>{{ Content }}"
+
+class NavigationTestCase(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.content = os.path.join(self.tmp.name, "content")
+        self.dest = os.path.join(self.tmp.name, "docs")
+        self.template = os.path.join(self.tmp.name, "template.html")
+        self.write(self.template, TEMPLATE)
+        for path in ["index.md", "about.md", "blog/index.md", "blog/first post.md", "blog/old/tom.md"]:
+            self.write(os.path.join(self.content, path), f"# {path}\n\ntext")
+        self.write(os.path.join(self.content, "notes.txt"), "not a page")
+
+class TestScanContent(NavigationTestCase):
+    def test_tree(self):
+        root = scan_content(self.content, self.dest)
+        self.assertListEqual([content_dir.name for content_dir in root.walk()], ["", "blog", "old"])
+        self.assertListEqual([os.path.relpath(page[1], self.dest) for page in root.all_pages()],
+            ["about.html", "index.html", "blog/first post.html", "blog/index.html", "blog/old/tom.html"])
+        self.assertEqual(root.dirs[0].index, os.path.join(self.dest, "blog", "index.html"))
+        self.assertIsNone(root.dirs[0].dirs[0].index)
+
+class TestNavigation(NavigationTestCase):
+    def slots(self, path):
+        return Navigation(scan_content(self.content, self.dest)).slots(os.path.join(self.dest, path))
+
+    def test_menu_and_breadcrumbs(self):
+        slots = self.slots("blog/first post.html")
+        self.assertEqual(slots["Navigation"], '<ul><li><a href="/">Home</a></li><li><a href="/about.html">about</a></li><li><a href="/blog/">blog</a></li></ul>')
+        self.assertEqual(slots["Siblings"], '<ul><li><a href="/blog/first%20post.html">first post</a></li><li>old</li></ul>')
+        self.assertEqual(slots["Breadcrumbs"], '<ol><li><a href="/">Home</a></li><li><a href="/blog/">blog</a></li><li aria-current="page">first post</li></ol>')
+
+    def test_index_pages_are_their_directory(self):
+        self.assertEqual(self.slots("blog/index.html")["Breadcrumbs"], '<ol><li><a href="/">Home</a></li><li aria-current="page">blog</li></ol>')
+        self.assertEqual(self.slots("index.html")["Breadcrumbs"], '<ol><li aria-current="page">Home</li></ol>')
+        self.assertEqual(self.slots("blog/old/tom.html")["Breadcrumbs"], '<ol><li><a href="/">Home</a></li><li><a href="/blog/">blog</a></li><li>old</li><li aria-current="page">tom</li></ol>')
+        self.assertEqual(self.slots("blog/old/tom.html")["Siblings"], '<ul><li><a href="/blog/old/tom.html">tom</a></li></ul>')
+
+    def test_template_without_slots_ignores_navigation(self):
+        navigation = Navigation(scan_content(self.content, self.dest))
+        self.assertIsNone(Template("{{ Content }}", navigation=navigation).navigation)
+        self.assertIs(Template(TEMPLATE, navigation=navigation).navigation, navigation)
+
+    def test_pages_get_their_slots_with_basepath(self):
+        with redirect_stdout(StringIO()):
+            generate_pages_recursive(self.content, self.template, self.dest, "/site/")
+        html = self.read(os.path.join(self.dest, "blog", "index.html"))
+        self.assertTrue(html.startswith('<nav><ul><li><a href="/site/">Home</a></li>'))
+        self.assertIn('<li><a href="/site/blog/first%20post.html">first post</a></li>', html)
+
+    def test_incremental_rerenders_the_directory_that_changed(self):
+        def build():
+            root = scan_content(self.content, self.dest)
+            with redirect_stdout(StringIO()):
+                to_render, _, _ = generate_pages_incremental(root.all_pages(), Template.load(self.template, navigation=Navigation(root)), self.dest, "/", os.path.join(self.tmp.name, "manifest.json"))
+            return sorted(os.path.relpath(page[1], self.dest) for page in to_render)
+        self.assertEqual(len(build()), 5)
+        self.assertListEqual(build(), [])
+        self.write(os.path.join(self.content, "blog", "second.md"), "# second\n\ntext")
+        self.assertListEqual(build(), ["blog/first post.html", "blog/index.html", "blog/second.html"])
+        self.assertIn("second", self.read(os.path.join(self.dest, "blog", "index.html")))
+        # old gains an index page, so every crumb below blog links to it
+        self.write(os.path.join(self.content, "blog", "old", "index.md"), "# old\n\ntext")
+        self.assertListEqual(build(), ["blog/first post.html", "blog/index.html", "blog/old/index.html", "blog/old/tom.html", "blog/second.html"])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,59 @@
+import gzip, os, unittest
+
+from .precompress import precompress
+from .test_main import TempDirTestCase
+
+class TestPrecompress(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.dest = os.path.join(self.tmp.name, "docs")
+        self.manifest = os.path.join(self.tmp.name, ".compress-manifest.json")
+        self.page = os.path.join(self.dest, "blog", "index.html")
+        self.write(self.page, "<p>hello</p>\n" * 100)
+        self.write(os.path.join(self.dest, "tom.png"), "png" * 100)
+
+    def test_writes_gz_of_compressible_files(self):
+        compressed, removed = precompress(self.dest, self.manifest)
+        self.assertListEqual(compressed, [self.page + ".gz"])
+        self.assertListEqual(removed, [])
+        with gzip.open(self.page + ".gz", 'rt') as f:
+            self.assertEqual(f.read(), "<p>hello</p>\n" * 100)
+        self.assertFalse(os.path.exists(os.path.join(self.dest, "tom.png.gz")))
+
+    def test_skips_files_that_would_not_shrink(self):
+        tiny = os.path.join(self.dest, "tiny.txt")
+        self.write(tiny, "a")
+        precompress(self.dest, self.manifest)
+        self.assertFalse(os.path.exists(tiny + ".gz"))
+        self.assertListEqual(precompress(self.dest, self.manifest)[0], [])
+
+    def test_unchanged_content_is_skipped_even_if_touched(self):
+        precompress(self.dest, self.manifest)
+        os.utime(self.page, ns=(0, 0))
+        self.assertListEqual(precompress(self.dest, self.manifest)[0], [])
+        self.write(self.page, "<p>bye</p>\n" * 100)
+        self.assertListEqual(precompress(self.dest, self.manifest)[0], [self.page + ".gz"])
+
+    def test_missing_gz_is_rewritten(self):
+        precompress(self.dest, self.manifest)
+        os.remove(self.page + ".gz")
+        self.assertListEqual(precompress(self.dest, self.manifest)[0], [self.page + ".gz"])
+
+    def test_stale_gz_removed(self):
+        precompress(self.dest, self.manifest)
+        os.remove(self.page)
+        _, removed = precompress(self.dest, self.manifest)
+        self.assertListEqual(removed, [self.page + ".gz"])
+
+    def test_gz_it_did_not_write_are_kept(self):
+        archive = os.path.join(self.dest, "archive.tar.gz")
+        script = os.path.join(self.dest, "app.js.gz")
+        self.write(archive, "tar")
+        self.write(script, "js")
+        precompress(self.dest, self.manifest)
+        self.assertListEqual(precompress(self.dest, self.manifest)[1], [])
+        self.assertTrue(os.path.exists(archive))
+        self.assertTrue(os.path.exists(script))
+
+if __name__ == "__main__":
+    unittest.main()
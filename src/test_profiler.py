@@ -0,0 +1,78 @@
+import json, os, unittest
+from contextlib import redirect_stdout
+from io import StringIO
+
+from . import htmlnode
+from . import profiler
+from .main import find_pages, generate_pages
+from .template import Template
+from .test_main import TempDirTestCase
+
+class TestProfiler(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.content = os.path.join(self.tmp.name, "content")
+        self.dest = os.path.join(self.tmp.name, "docs")
+        os.makedirs(self.content)
+        for i in range(3):
+            self.write(os.path.join(self.content, f"page{i}.md"), f"# Page {i}\n\nSome **bold** and a [link](/x)\n\n- a\n- b\n\n```\ncode\n```")
+        self.template = Template('<title>{{ Title }}</title><a href="/">home</a>{{ Content }}')
+
+    def tearDown(self):
+        profiler.disable()
+        super().tearDown()
+
+    def build(self, jobs = 1):
+        pages = find_pages(self.content, self.dest)
+        with redirect_stdout(StringIO()):
+            generate_pages(pages, self.template, "/site/", jobs)
+        return {dest: self.read(dest) for _, dest in pages}
+
+    def test_profiled_output_is_identical(self):
+        expected = self.build()
+        profiler.enable()
+        self.assertDictEqual(self.build(), expected)
+
+    def test_stages_are_recorded(self):
+        profile = profiler.enable()
+        self.build()
+        self.assertEqual(len(profile.pages), 3)
+        totals = profile.totals()
+        for stage in profiler.STAGES:
+            self.assertGreater(totals[stage], 0, stage)
+        self.assertAlmostEqual(sum(totals[stage] for stage in profiler.STAGES + ["other"]), totals["total"])
+
+    def test_mapped_sources_time_reads(self):
+        big = os.path.join(self.content, "big.md")
+        self.write(big, "# Big\n\n" + "Some **bold** text\n\n" * 5000)
+        profile = profiler.enable()
+        self.build()
+        self.assertGreater(profile.pages[big]["read"], 0)
+        self.assertGreater(profile.pages[big]["markdown_to_blocks"], 0)
+
+    def test_parallel_timings_are_merged(self):
+        profile = profiler.enable()
+        self.build(jobs=2)
+        self.assertEqual(len(profile.pages), 3)
+
+    def test_report_and_json(self):
+        profile = profiler.enable()
+        self.build()
+        report = profile.report(top=2)
+        self.assertIn("text_to_textnodes", report)
+        self.assertEqual(report.count(self.content), 2)
+        path = os.path.join(self.tmp.name, "profile.json")
+        profile.save(path)
+        with open(path) as f:
+            self.assertEqual(len(json.load(f)["pages"]), 3)
+
+    def test_disable_restores_functions(self):
+        original = htmlnode.block_to_block_type
+        profiler.enable()
+        self.assertIsNot(htmlnode.block_to_block_type, original)
+        profiler.disable()
+        self.assertIs(htmlnode.block_to_block_type, original)
+        self.assertIsNone(profiler.active)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,67 @@
+import os, tempfile, unittest
+from contextlib import redirect_stdout
+from io import StringIO
+
+from .htmlnode import iter_markdown_html, markdown_to_html_node
+from .main import find_pages, generate_pages
+from .rendercache import RenderCache
+from .template import Template
+from .texthandling import markdown_to_blocks
+
+FOOTER = "Licensed under **MIT**, see [license](/license)"
+
+class TestRenderCache(unittest.TestCase):
+    def test_hits_and_misses(self):
+        cache = RenderCache()
+        md = f"# One\n\n{FOOTER}\n\n# Two\n\n{FOOTER}"
+        html = ''.join(iter_markdown_html(markdown_to_blocks(md), cache))
+        self.assertEqual(html, markdown_to_html_node(md).to_html())
+        self.assertEqual((cache.hits, cache.misses), (1, 3))
+
+    def test_lru_eviction(self):
+        cache = RenderCache(max_bytes=100)
+        for i in range(10):
+            cache.put(RenderCache.key(str(i)), ["x" * 20, "", []])
+        self.assertLessEqual(cache.size, 100)
+        self.assertGreater(cache.evictions, 0)
+        self.assertIsNone(cache.get(RenderCache.key("0")))
+        self.assertEqual(cache.get(RenderCache.key("9")), ["x" * 20, "", []])
+
+    def test_recently_used_survives(self):
+        cache = RenderCache(max_bytes=3 * (32 + 1))
+        for block in "abc":
+            cache.put(RenderCache.key(block), [block, "", []])
+        cache.get(RenderCache.key("a"))
+        cache.put(RenderCache.key("d"), ["d", "", []])
+        self.assertEqual(cache.get(RenderCache.key("a")), ["a", "", []])
+        self.assertIsNone(cache.get(RenderCache.key("b")))
+
+    def test_persisted_between_builds(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "cache.json")
+            cache = RenderCache(path=path)
+            list(iter_markdown_html([FOOTER], cache))
+            cache.save()
+            loaded = RenderCache.load(path)
+            list(iter_markdown_html([FOOTER], loaded))
+            self.assertEqual((loaded.hits, loaded.misses), (1, 0))
+
+    def test_unreadable_file_loads_empty(self):
+        self.assertEqual(len(RenderCache.load("/nonexistent/cache.json").entries), 0)
+
+class TestCachedBuild(unittest.TestCase):
+    def test_parallel_workers_report_back(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            content = os.path.join(tmp, "content")
+            os.makedirs(content)
+            for i in range(4):
+                with open(os.path.join(content, f"page{i}.md"), 'w') as f:
+                    f.write(f"# Page {i}\n\n{FOOTER}")
+            cache = RenderCache(path=os.path.join(tmp, "cache.json"))
+            with redirect_stdout(StringIO()):
+                generate_pages(find_pages(content, os.path.join(tmp, "docs")), Template("{{ Content }}"), "/", 2, cache)
+            self.assertEqual(cache.hits + cache.misses, 8)
+            self.assertIn(RenderCache.key(FOOTER), cache.entries)
+
+if __name__ == "__main__":
+    unittest.main()
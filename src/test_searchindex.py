@@ -0,0 +1,99 @@
+import json, os, unittest
+from collections import Counter
+from contextlib import redirect_stdout
+from io import StringIO
+from unittest import mock
+
+from .main import find_pages, generate_pages, generate_pages_incremental
+from .searchindex import SearchIndexWriter, tokenize_block
+from .template import Template
+from .test_main import SiteTestCase
+
+class TestTokenizeBlock(unittest.TestCase):
+    def test_urls_and_markup_are_skipped(self):
+        self.assertListEqual(tokenize_block("See **The Ring** and [elves](/elves) ![map](/map.png)"), ["see", "the", "ring", "and", "elves", "map"])
+
+    def test_block_markers_are_skipped(self):
+        self.assertListEqual(tokenize_block("## Rivers of Gondor"), ["rivers", "of", "gondor"])
+        self.assertListEqual(tokenize_block("1. one\n2. Two"), ["one", "two"])
+        self.assertListEqual(tokenize_block("```\nprint(Ring)\n```"), ["print", "ring"])
+
+class TestSearchIndexWriter(SiteTestCase):
+    def index(self, max_postings, docs_per_chunk = 2):
+        dest = os.path.join(self.tmp.name, f"out{max_postings}")
+        index = SearchIndexWriter(dest, "/", docs_per_chunk=docs_per_chunk, max_postings=max_postings)
+        for i in range(5):
+            index.add(os.path.join(dest, f"page{i}.html"), f"Page {i}", Counter({"ring": i + 1, f"word{i}": 1, "river": 2}))
+        index.close()
+        files = {}
+        for name in os.listdir(os.path.join(dest, "search")):
+            with open(os.path.join(dest, "search", name)) as f:
+                files[name] = json.load(f)
+        return files
+
+    def test_shards_and_docs(self):
+        files = self.index(1000)
+        self.assertSetEqual(set(files), {"index.json", "docs-0.json", "docs-1.json", "docs-2.json", "ri.json", "wo.json"})
+        self.assertDictEqual(files["index.json"]["shards"], {"ri": "ri", "wo": "wo"})
+        self.assertListEqual(files["docs-1.json"], [["/page2.html", "Page 2"], ["/page3.html", "Page 3"]])
+        self.assertListEqual(files["ri.json"]["ring"], [[0, 1], [1, 2], [2, 3], [3, 4], [4, 5]])
+        self.assertListEqual(files["wo.json"]["word3"], [[3, 1]])
+
+    def test_spilling_gives_the_same_index(self):
+        self.assertDictEqual(self.index(2), self.index(1000))
+
+    def test_stale_files_removed(self):
+        dest = os.path.join(self.tmp.name, "out")
+        self.write(os.path.join(dest, "search", "zz.json"), "{}")
+        index = SearchIndexWriter(dest, "/")
+        index.add(os.path.join(dest, "index.html"), "Home", Counter({"home": 1}))
+        index.close()
+        self.assertListEqual(sorted(os.listdir(os.path.join(dest, "search"))), ["docs-0.json", "ho.json", "index.json"])
+
+class TestBuildIndex(SiteTestCase):
+    def build(self, **options):
+        dest = os.path.join(self.tmp.name, "out" + ''.join(map(str, options.values())))
+        index = SearchIndexWriter(dest, "/")
+        with redirect_stdout(StringIO()):
+            generate_pages(find_pages(self.content, dest), Template.load(self.template), "/", index=index, **options)
+        index.close()
+        with open(os.path.join(dest, "search", "docs-0.json")) as f:
+            docs = json.load(f)
+        with open(os.path.join(dest, "search", "bo.json")) as f:
+            # the async build may number pages in a different order
+            return {term: sorted(map(lambda posting: (docs[posting[0]][0], posting[1]), postings)) for term, postings in json.load(f).items()}
+
+    def test_every_build_mode_indexes_pages(self):
+        serial = self.build()
+        self.assertDictEqual(serial, {"bold": [("/blog/post.html", 1)]})
+        self.assertEqual(self.build(jobs=2), serial)
+        self.assertEqual(self.build(io_workers=2), serial)
+
+    def test_incremental_indexes_skipped_pages(self):
+        self.incremental()
+        index = SearchIndexWriter(self.dest, "/")
+        with redirect_stdout(StringIO()):
+            to_render, _, _ = generate_pages_incremental(find_pages(self.content, self.dest), self.template, self.dest, "/", self.manifest, index=index)
+        index.close()
+        self.assertEqual(len(to_render), 0)
+        self.assertEqual(index.doc_count, 2)
+
+    def test_incremental_keeps_terms_of_skipped_pages(self):
+        def build():
+            index = SearchIndexWriter(self.dest, "/")
+            with redirect_stdout(StringIO()):
+                to_render, _, _ = generate_pages_incremental(find_pages(self.content, self.dest), self.template, self.dest, "/", self.manifest, index=index)
+            files = {}
+            for path in index.close():
+                with open(path) as f:
+                    files[path] = f.read()
+            return to_render, files
+        _, files = build()
+        # the terms come from the manifest, unchanged pages aren't read again
+        with mock.patch.object(SearchIndexWriter, "add_source", side_effect=AssertionError("page was re-read")):
+            to_render, rebuilt = build()
+        self.assertEqual(len(to_render), 0)
+        self.assertDictEqual(rebuilt, files)
+
+if __name__ == "__main__":
+    unittest.main()
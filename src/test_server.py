@@ -0,0 +1,104 @@
+import http.client, os, threading, time, unittest
+from contextlib import redirect_stderr
+from io import StringIO
+from unittest import mock
+
+from .server import DevServer, PageCache, source_candidates
+from .test_main import SiteTestCase
+
+class TestSourceCandidates(unittest.TestCase):
+    def test_candidates(self):
+        self.assertListEqual(source_candidates(""), ["index.md"])
+        self.assertListEqual(source_candidates("blog/"), ["blog/index.md"])
+        self.assertListEqual(source_candidates("blog/post.html"), ["blog/post.md"])
+        self.assertListEqual(source_candidates("blog/post"), ["blog/post.md", "blog/post/index.md"])
+
+class TestPageCache(unittest.TestCase):
+    def test_lru_and_versions(self):
+        cache = PageCache(max_bytes=10)
+        cache.put("a", 1, b"aaaa")
+        cache.put("b", 1, b"bbbb")
+        self.assertIsNotNone(cache.get("a", 1))
+        cache.put("c", 1, b"cccc")
+        # b was the least recently used
+        self.assertIsNone(cache.get("b", 1))
+        self.assertIsNotNone(cache.get("a", 1))
+        self.assertIsNone(cache.get("a", 2))
+        self.assertEqual(cache.size, 8)
+
+class TestDevServer(SiteTestCase):
+    def setUp(self):
+        super().setUp()
+        self.write(os.path.join(self.tmp.name, "static", "index.css"), "body {}")
+        self.server = DevServer(("127.0.0.1", 0), self.tmp.name, "/site/")
+        self.thread = threading.Thread(target=self.server.serve_forever)
+        self.thread.start()
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.thread.join()
+        self.server.server_close()
+        super().tearDown()
+
+    def get(self, path, headers = {}):
+        connection = http.client.HTTPConnection(*self.server.server_address)
+        with redirect_stderr(StringIO()):
+            connection.request("GET", path, headers=headers)
+            response = connection.getresponse()
+            body = response.read().decode()
+        connection.close()
+        return response, body
+
+    def test_renders_pages_on_request(self):
+        response, body = self.get("/site/blog/post")
+        self.assertEqual(response.status, 200)
+        self.assertIn("<p>Some <b>bold</b> text</p>", body)
+        self.assertEqual(self.get("/site/blog/post.html")[1], body)
+        self.assertIn('href="/site/blog/post"', self.get("/site/")[1])
+        self.assertEqual(self.get("/site")[0].status, 200)
+        # nothing was written to the output directory
+        self.assertFalse(os.path.exists(self.dest))
+
+    def test_static_files_and_missing_pages(self):
+        response, body = self.get("/site/index.css")
+        self.assertEqual((response.status, body), (200, "body {}"))
+        self.assertEqual(self.get("/site/missing")[0].status, 404)
+        self.assertEqual(self.get("/index.css")[0].status, 404)
+        self.assertEqual(self.get("/site/..%2F..%2Fetc%2Fpasswd")[0].status, 404)
+
+    def test_conditional_get(self):
+        response, _ = self.get("/site/blog/post")
+        etag = response.getheader("ETag")
+        response, body = self.get("/site/blog/post", {"If-None-Match": etag})
+        self.assertEqual((response.status, body), (304, ""))
+
+    def test_edits_invalidate(self):
+        etag = self.get("/site/blog/post")[0].getheader("ETag")
+        source = os.path.join(self.content, "blog", "post.md")
+        self.write(source, "# Post\n\nedited")
+        os.utime(source, ns=(time.time_ns(), time.time_ns() + 10**9))
+        response, body = self.get("/site/blog/post", {"If-None-Match": etag})
+        self.assertEqual(response.status, 200)
+        self.assertIn("<p>edited</p>", body)
+        self.write(self.template, "<main>{{ Content }}</main>")
+        os.utime(self.template, ns=(time.time_ns(), time.time_ns() + 2 * 10**9))
+        self.assertTrue(self.get("/site/blog/post")[1].startswith("<main>"))
+
+    def test_content_dirs_not_checked_without_navigation(self):
+        with mock.patch.object(DevServer, "dir_mtimes", side_effect=AssertionError("content was stat'ed")):
+            self.assertEqual(self.get("/site/blog/post")[0].status, 200)
+
+    def test_navigation_follows_content(self):
+        self.write(self.template, "<nav>{{ Navigation }}</nav>{{ Content }}")
+        os.utime(self.template, ns=(time.time_ns(), time.time_ns() + 10**9))
+        self.assertNotIn("new.html", self.get("/site/")[1])
+        self.write(os.path.join(self.content, "new.md"), "# New\n\npage")
+        os.utime(self.content, ns=(time.time_ns(), time.time_ns() + 10**9))
+        self.assertIn('href="/site/new.html"', self.get("/site/")[1])
+        self.assertIn("<p>page</p>", self.get("/site/new")[1])
+        os.remove(os.path.join(self.content, "new.md"))
+        os.utime(self.content, ns=(time.time_ns(), time.time_ns() + 2 * 10**9))
+        self.assertNotIn("new.html", self.get("/site/")[1])
+
+if __name__ == "__main__":
+    unittest.main()
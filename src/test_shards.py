@@ -0,0 +1,71 @@
+import os, shutil, unittest
+from contextlib import redirect_stdout
+from io import StringIO
+
+from .main import main
+from .shards import merge_shards, parse_shard, shard_of
+from .test_main import TempDirTestCase
+
+class TestParseShard(unittest.TestCase):
+    def test_parse(self):
+        self.assertEqual(parse_shard("2/4"), (2, 4))
+        for text in ["0/4", "5/4", "1/0", "a/b", "3"]:
+            with self.assertRaises(ValueError):
+                parse_shard(text)
+
+class TestShardOf(unittest.TestCase):
+    def test_stable_and_spread(self):
+        paths = [os.path.join("content", f"section{i % 5}", f"page{i}.md") for i in range(300)]
+        shards = list(map(lambda path: shard_of(path, "content", 3), paths))
+        self.assertListEqual(shards, list(map(lambda path: shard_of(os.path.join(".", path), "./content", 3), paths)))
+        self.assertSetEqual(set(shards), {1, 2, 3})
+
+class TestShardedBuild(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.cwd = os.getcwd()
+        os.chdir(self.tmp.name)
+        for i in range(12):
+            self.write(os.path.join("content", f"section{i % 3}", f"page{i}.md"), f"# Page {i}\n\nlinks to [the next page](/section{(i + 1) % 3}/page{(i + 1) % 12})")
+        self.write(os.path.join("static", "index.css"), "body {}")
+        self.write("template.html", "<title>{{ Title }}</title><body>{{ Content }}</body>")
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        super().tearDown()
+
+    def tree(self, dir_path):
+        files = {}
+        for path, _, names in os.walk(dir_path):
+            for name in names:
+                files[os.path.relpath(os.path.join(path, name), dir_path)] = self.read(os.path.join(path, name))
+        return files
+
+    def build_shards(self, count):
+        for i in range(1, count + 1):
+            with redirect_stdout(StringIO()):
+                main(["/site/", "--shard", f"{i}/{count}"])
+            shutil.move("docs", os.path.join("shards", str(i)))
+        return [os.path.join("shards", str(i)) for i in range(1, count + 1)]
+
+    def test_merge_matches_unsharded_build(self):
+        with redirect_stdout(StringIO()):
+            main(["/site/", "--site-url", "https://example.com"])
+        expected = self.tree("docs")
+        shutil.rmtree("docs")
+        shard_dirs = self.build_shards(3)
+        # every shard only rendered its own pages
+        self.assertEqual(sum(map(lambda shard: len(self.tree(shard)) - 2, shard_dirs)), 12)
+        output = StringIO()
+        with redirect_stdout(output):
+            main(["merge", *shard_dirs, "--site-url", "https://example.com"])
+        self.assertDictEqual(self.tree("docs"), expected)
+        self.assertNotIn("Broken link", output.getvalue())
+
+    def test_missing_shard(self):
+        shard_dirs = self.build_shards(3)
+        with self.assertRaises(ValueError):
+            merge_shards(shard_dirs[:2], "docs")
+
+if __name__ == "__main__":
+    unittest.main()
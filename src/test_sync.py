@@ -0,0 +1,72 @@
+import os, unittest
+
+from .sync import link_or_copy, sync_tree, is_up_to_date
+from .test_main import TempDirTestCase
+
+class TestSyncTree(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.src = os.path.join(self.tmp.name, "static")
+        self.dest = os.path.join(self.tmp.name, "docs")
+        self.write(os.path.join(self.src, "index.css"), "body {}")
+        self.write(os.path.join(self.src, "images", "tom.png"), "png")
+
+
+    def test_first_sync_copies_everything(self):
+        copied, removed = sync_tree(self.src, self.dest)
+        self.assertEqual(len(copied), 2)
+        self.assertListEqual(removed, [])
+        self.assertEqual(self.read(os.path.join(self.dest, "images", "tom.png")), "png")
+
+    def test_unchanged_files_are_skipped(self):
+        sync_tree(self.src, self.dest)
+        self.assertEqual(sync_tree(self.src, self.dest), ([], []))
+
+    def test_changed_file_is_copied(self):
+        sync_tree(self.src, self.dest, link=False)
+        self.write(os.path.join(self.src, "index.css"), "body { color: red }")
+        copied, _ = sync_tree(self.src, self.dest, link=False)
+        self.assertListEqual(copied, [os.path.join(self.dest, "index.css")])
+        self.assertEqual(self.read(os.path.join(self.dest, "index.css")), "body { color: red }")
+
+    def test_stale_files_removed_and_pages_kept(self):
+        page = os.path.join(self.dest, "blog", "index.html")
+        stale = os.path.join(self.dest, "old", "gone.png")
+        self.write(page, "<html></html>")
+        self.write(stale, "old")
+        _, removed = sync_tree(self.src, self.dest, keep=[page])
+        self.assertListEqual(removed, [os.path.normpath(stale)])
+        self.assertTrue(os.path.exists(page))
+        self.assertFalse(os.path.exists(os.path.join(self.dest, "old")))
+
+    def test_siblings_of_kept_files_are_kept(self):
+        page = os.path.join(self.dest, "index.html")
+        self.write(page, "<html></html>")
+        self.write(page + ".gz", "gz")
+        self.write(os.path.join(self.dest, "index.css.gz"), "gz")
+        self.write(os.path.join(self.dest, "gone.css.gz"), "gz")
+        _, removed = sync_tree(self.src, self.dest, keep=[page], siblings=(".gz",))
+        self.assertListEqual(removed, [os.path.normpath(os.path.join(self.dest, "gone.css.gz"))])
+        self.assertTrue(os.path.exists(page + ".gz"))
+        self.assertTrue(os.path.exists(os.path.join(self.dest, "index.css.gz")))
+
+    def test_hash_compare_skips_touched_files(self):
+        sync_tree(self.src, self.dest, link=False)
+        css = os.path.join(self.src, "index.css")
+        os.utime(css, ns=(0, 0))
+        self.assertFalse(is_up_to_date(css, os.path.join(self.dest, "index.css")))
+        self.assertTrue(is_up_to_date(css, os.path.join(self.dest, "index.css"), use_hash=True))
+        self.assertTrue(is_up_to_date(css, os.path.join(self.dest, "index.css")))
+
+    def test_replacing_a_link_leaves_the_source_alone(self):
+        src = os.path.join(self.src, "index.css")
+        dest = os.path.join(self.tmp.name, "index.css")
+        link_or_copy(src, dest)
+        other = os.path.join(self.tmp.name, "other.css")
+        self.write(other, "other")
+        link_or_copy(other, dest)
+        self.assertEqual(self.read(src), "body {}")
+        self.assertEqual(self.read(dest), "other")
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,54 @@
+import pickle, unittest
+
+from .template import Template, rewrite_links
+
+SOURCE = '<title>{{ Title }}</title><link href="/index.css" /><article>{{ Content }}</article>'
+
+def replace_chain(source, title, content, basepath):
+    return source.replace('{{ Title }}', title).replace('{{ Content }}', content).replace('href="/', f'href="{basepath}').replace('src="/', f'src="{basepath}')
+
+class TestRewriteLinks(unittest.TestCase):
+    def test_rewrites_href_and_src(self):
+        self.assertEqual(
+            rewrite_links('<a href="/a">x</a><img src="/b.png" alt="c">', "/site/"),
+            '<a href="/site/a">x</a><img src="/site/b.png" alt="c">'
+        )
+
+    def test_root_basepath_is_unchanged(self):
+        html = '<a href="/a">x</a>'
+        self.assertIs(rewrite_links(html, "/"), html)
+
+    def test_external_links_untouched(self):
+        html = '<a href="https://example.com/">x</a>'
+        self.assertEqual(rewrite_links(html, "/site/"), html)
+
+class TestTemplate(unittest.TestCase):
+    def test_matches_replace_chain(self):
+        content = '<p><a href="/blog">blog</a><img src="/tom.png" alt="tom"></img></p>'
+        for basepath in ["/", "/Boot.Dev-Static-Site-Generator/"]:
+            self.assertEqual(
+                Template(SOURCE).render(basepath, Title="Hi", Content=content),
+                replace_chain(SOURCE, "Hi", content, basepath)
+            )
+
+    def test_repeated_and_unknown_slots(self):
+        template = Template("{{ Title }} - {{ Title }} {{ Footer }}")
+        self.assertEqual(template.render("/", Title="a"), "a - a {{ Footer }}")
+
+    def test_no_slots(self):
+        self.assertEqual(Template("plain").render("/x/"), "plain")
+
+    def test_pickles_for_workers(self):
+        template = Template(SOURCE, "template.html")
+        template.render("/x/", Title="a", Content="b")
+        copy = pickle.loads(pickle.dumps(template))
+        self.assertEqual(copy.render("/x/", Title="a", Content="b"), template.render("/x/", Title="a", Content="b"))
+        self.assertEqual(copy.hash, template.hash)
+
+    def test_minify(self):
+        template = Template("<p>\n  {{ Title }}  </p>\n\n<pre>{{ Content }}</pre>", minify=True)
+        self.assertEqual(template.render("/", Title="a", Content="x\n\n  y"), "<p>\na </p>\n<pre>x\n\n  y</pre>")
+        self.assertNotEqual(template.hash, Template(template.parts[0]).hash)
+
+if __name__ == "__main__":
+    unittest.main()
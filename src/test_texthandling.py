@@ -1,6 +1,8 @@
 import unittest
 
-from texthandling import BlockType, markdown_to_blocks, block_to_block_type
+from io import StringIO
+
+from .texthandling import BlockType, markdown_to_blocks, iter_buffer_blocks, iter_markdown_blocks, block_to_block_type
 
 class TestMarkdownToBlocks(unittest.TestCase):
     def test_multiple_blocks(self):
@@ -28,6 +30,27 @@ This is the same paragraph on a new line
         blocks = markdown_to_blocks(md)
         self.assertListEqual(blocks, [])
 
+class TestIterMarkdownBlocks(unittest.TestCase):
+    def test_matches_markdown_to_blocks(self):
+        for md in [
+            "# Title\n\nparagraph\nsame paragraph\n\n- a\n- b\n",
+            "a\n\n\nb\n\n\n\nc",
+            "  indented\n  \n\n \n\ttabbed  \n\n",
+            "```\ncode\n\nstill code\n```",
+            "no trailing newline",
+            "ünïcode **text**\n\nüber",
+            "\n\n\n",
+            "",
+        ]:
+            self.assertListEqual(list(iter_markdown_blocks(StringIO(md))), markdown_to_blocks(md), repr(md))
+            self.assertListEqual(list(iter_buffer_blocks(md.encode())), markdown_to_blocks(md), repr(md))
+
+    def test_is_lazy(self):
+        lines = iter(["first\n", "\n", "second\n"])
+        blocks = iter_markdown_blocks(lines)
+        self.assertEqual(next(blocks), "first")
+        self.assertEqual(next(lines), "second\n")
+
 class TestBlockToBlockType(unittest.TestCase):
     def test_heading(self):
         self.assertEqual(
@@ -89,5 +112,21 @@ class TestBlockToBlockType(unittest.TestCase):
             BlockType.ORDERED_LIST
         )
 
+    def test_multiline_heading_is_paragraph(self):
+        self.assertEqual(block_to_block_type("# heading\nmore"), BlockType.PARAGRAPH)
+
+    def test_code_fences_cannot_overlap(self):
+        self.assertEqual(block_to_block_type("````"), BlockType.PARAGRAPH)
+        self.assertEqual(block_to_block_type("``````"), BlockType.CODE)
+
+    def test_quote_with_trailing_newline(self):
+        self.assertEqual(block_to_block_type("> quote\n"), BlockType.PARAGRAPH)
+
+    def test_ordered_list_leading_zero(self):
+        self.assertEqual(block_to_block_type("01. one\n2. two"), BlockType.ORDERED_LIST)
+
+    def test_ordered_list_needs_space(self):
+        self.assertEqual(block_to_block_type("1.one\n2. two"), BlockType.PARAGRAPH)
+
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
@@ -1,7 +1,7 @@
 import unittest
 
-from textnode import TextNode, TextType, text_to_textnodes, split_nodes_delimiter, split_nodes_image, split_nodes_link
-from texthandling import extract_markdown_images, extract_markdown_links
+from .textnode import TextNode, TextType, text_to_textnodes, split_nodes_delimiter, split_nodes_image, split_nodes_link
+from .texthandling import extract_markdown_images, extract_markdown_links
 
 class TestTextNode(unittest.TestCase):
     def test_eq(self):
@@ -18,6 +18,11 @@ class TestTextNode(unittest.TestCase):
         node2 = TextNode("Have some text", TextType.BOLD)
         self.assertNotEqual(node, node2)
 
+    def test_no_instance_dict(self):
+        node = TextNode("compact", TextType.TEXT)
+        self.assertFalse(hasattr(node, "__dict__"))
+        self.assertEqual(repr(node), "TextNode(compact, text, None)")
+
 class TestSplitNodesDelimiter(unittest.TestCase):
     def test_code_block(self):
         new_nodes = split_nodes_delimiter([TextNode("This is text with a `code block` word", TextType.TEXT)], '`', TextType.CODE)
@@ -198,5 +203,37 @@ class TestTextToTextNodes(unittest.TestCase):
         ]
         self.assertListEqual(nodes, expected)
 
+    def test_nested_delimiters(self):
+        # each delimiter only pairs up inside the pieces left by the ones before it
+        self.assertListEqual(text_to_textnodes("a `b **c` d**"), [
+            TextNode("a ", TextType.TEXT),
+            TextNode("b ", TextType.CODE),
+            TextNode("c", TextType.BOLD),
+            TextNode(" d", TextType.CODE),
+        ])
+
+    def test_link_inside_bold(self):
+        self.assertListEqual(text_to_textnodes("**see [docs](/docs) now**"), [
+            TextNode("see ", TextType.BOLD),
+            TextNode("docs", TextType.LINK, "/docs"),
+            TextNode(" now", TextType.BOLD),
+        ])
+
+    def test_repeated_link_text(self):
+        self.assertListEqual(text_to_textnodes("a [a](a) a"), [
+            TextNode("a ", TextType.TEXT),
+            TextNode("a", TextType.LINK, "a"),
+            TextNode(" a", TextType.TEXT),
+        ])
+
+    def test_matches_chained_splits(self):
+        for text in ["**b** _i_ `c` [l](u) ![i](v)", "***x**", "![a [b](c)", "_a **b_ c** d_", "!**[l](u)**", "``", ""]:
+            nodes = [TextNode(text, TextType.TEXT)]
+            nodes = split_nodes_delimiter(nodes, "**", TextType.BOLD)
+            nodes = split_nodes_delimiter(nodes, "_", TextType.ITALIC)
+            nodes = split_nodes_delimiter(nodes, "`", TextType.CODE)
+            nodes = split_nodes_image(split_nodes_link(nodes))
+            self.assertListEqual(text_to_textnodes(text), nodes, text)
+
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,36 @@
+import os, unittest
+
+from .test_main import TempDirTestCase
+from .watch import snapshot, changed_paths
+
+class TestSnapshot(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.dir = os.path.join(self.tmp.name, "content")
+        self.file = os.path.join(self.tmp.name, "template.html")
+        for path in [self.file, os.path.join(self.dir, "index.md"), os.path.join(self.dir, "blog", "post.md")]:
+            self.write(path, "x")
+
+    def test_snapshot_files_and_dirs(self):
+        self.assertListEqual(sorted(snapshot([self.dir, self.file])), sorted([
+            self.file,
+            os.path.join(self.dir, "index.md"),
+            os.path.join(self.dir, "blog", "post.md"),
+        ]))
+
+    def test_changed_paths(self):
+        before = snapshot([self.dir])
+        post = os.path.join(self.dir, "blog", "post.md")
+        new = os.path.join(self.dir, "new.md")
+        self.write(post, "longer")
+        self.write(new, "x")
+        os.remove(os.path.join(self.dir, "index.md"))
+        changed, removed = changed_paths(before, snapshot([self.dir]))
+        self.assertListEqual(changed, sorted([post, new]))
+        self.assertListEqual(removed, [os.path.join(self.dir, "index.md")])
+
+    def test_unchanged(self):
+        self.assertEqual(changed_paths(snapshot([self.dir]), snapshot([self.dir])), ([], []))
+
+if __name__ == "__main__":
+    unittest.main()
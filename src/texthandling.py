@@ -1,4 +1,4 @@
-import re
+import mmap, re
 from enum import Enum
 
 class BlockType(Enum):
@@ -9,29 +9,103 @@ class BlockType(Enum):
     UNORDERED_LIST = "unordered_list"
     ORDERED_LIST = "ordered_list"
 
+IMAGE_PATTERN = re.compile(r"\!\[(.*?)\]\((.*?)\)")
+LINK_PATTERN = re.compile(r"(?<!\!)\[(.*?)\]\((.*?)\)")
+
 def extract_markdown_images(text):
-    return re.findall(r"\!\[(.*?)\]\((.*?)\)", text)
+    return IMAGE_PATTERN.findall(text)
 
 def extract_markdown_links(text):
-    return re.findall(r"(?<!\!)\[(.*?)\]\((.*?)\)", text)
+    return LINK_PATTERN.findall(text)
 
 def markdown_to_blocks(markdown):
     return list(filter(lambda b: len(b) != 0, map(lambda b: b.strip(), markdown.split("\n\n"))))
 
+# Lazily yields the same blocks as markdown_to_blocks from any iterable of lines, e.g. an open file,
+# so only the block being built is held in memory. A block is a run of non-empty lines.
+def iter_markdown_blocks(lines):
+    block_lines = []
+    for line in lines:
+        if line.endswith('\n'):
+            line = line[:-1]
+        if len(line) != 0:
+            block_lines.append(line)
+            continue
+        if len(block_lines) != 0:
+            block = '\n'.join(block_lines).strip()
+            block_lines = []
+            if len(block) != 0:
+                yield block
+    if len(block_lines) != 0:
+        block = '\n'.join(block_lines).strip()
+        if len(block) != 0:
+            yield block
+
+# Same blocks again, split straight out of a bytes-like buffer such as an mmap of the source. Each
+# block is found with one find and decoded once, instead of going through a str per line, and an
+# mmap's pages are released every release_size bytes so a large source is never resident at once.
+# The buffer has to use '\n' line endings, text mode files translate the others for iter_markdown_blocks.
+# timed wraps the copy and decode of each block, where an mmap's pages are actually read in.
+def iter_buffer_blocks(buffer, encoding = "utf-8", release_size = 2**20, timed = None):
+    release = getattr(buffer, "madvise", None) if hasattr(mmap, "MADV_DONTNEED") else None
+    read = lambda start, end: buffer[start:end].decode(encoding)
+    if timed != None:
+        read = timed(read)
+    start = released = 0
+    while start < len(buffer):
+        end = buffer.find(b"\n\n", start)
+        if end == -1:
+            end = len(buffer)
+        block = read(start, end).strip()
+        if release != None and end - released >= release_size:
+            release(mmap.MADV_DONTNEED, released, end - end % mmap.PAGESIZE - released)
+            released = end - end % mmap.PAGESIZE
+        start = end + 2
+        if len(block) != 0:
+            yield block
+
+HEADING_PATTERN = re.compile(r"#{1,6} [^\n]*")
+
+# Dispatches on the first character, since every block type other than a paragraph is
+# decided by it, and then checks the rest of the block in a single scan.
 def block_to_block_type(block):
-    if re.fullmatch(r"^#{1,6} .*$", block):
-        return BlockType.HEADING
-    if re.fullmatch(r"^```(.|\n)*```$", block):
-        return BlockType.CODE
-    if re.fullmatch(r"^(>.*\n)*(>.*)$", block):
-        return BlockType.QUOTE
-    if re.fullmatch(r"^(- .*\n)*(- .*)$", block):
-        return BlockType.UNORDERED_LIST
-    # "all" part is just checking that it starts at 1 and sequentially increases
-    if re.fullmatch(r"^(\d+\. .*\n)*(\d+\. .*)$", block) and all(map(lambda iv: iv[0] == iv[1], enumerate(map(lambda l: int(l[:l.index('.')])-1, block.split('\n'))))):
-            return BlockType.ORDERED_LIST
+    match block[:1]:
+        case '#':
+            if HEADING_PATTERN.fullmatch(block):
+                return BlockType.HEADING
+        case '`':
+            if len(block) >= 6 and block.startswith("```") and block.endswith("```"):
+                return BlockType.CODE
+        case '>':
+            # every newline has to start another quoted line
+            if block.count('\n') == block.count('\n>'):
+                return BlockType.QUOTE
+        case '-':
+            if block.startswith("- ") and block.count('\n') == block.count('\n- '):
+                return BlockType.UNORDERED_LIST
+        case first if first.isdecimal():
+            if is_ordered_list(block):
+                return BlockType.ORDERED_LIST
     return BlockType.PARAGRAPH
 
+# every line is "<n>. " where n counts up from 1
+def is_ordered_list(block):
+    for index, line in enumerate(block.split('\n')):
+        dot = line.find('. ')
+        number = line[:dot]
+        if dot <= 0 or not number.isdecimal() or int(number) != index + 1:
+            return False
+    return True
+
+# Counts the words of a page as iter_markdown_html renders it, so markers like '#', '-' and '1.',
+# code fences and link urls never count.
+class WordCounter:
+    def __init__(self):
+        self.count = 0
+
+    def read(self, text, urls):
+        self.count += len(text.split())
+
 def trim_line_leading_markdown(block, indicator):
     return '\n'.join(map(lambda l: l[l.index(indicator)+1:].strip(), block.split('\n')))
 
@@ -1,6 +1,7 @@
+import re
 from enum import Enum
 
-from texthandling import extract_markdown_images, extract_markdown_links
+from .texthandling import IMAGE_PATTERN, extract_markdown_images, extract_markdown_links
 
 class TextType(Enum):
     TEXT = "text"
@@ -11,6 +12,9 @@ class TextType(Enum):
     IMAGE = "image"
 
 class TextNode:
+    # text nodes are created for every inline span, slots keep them small
+    __slots__ = ("text", "text_type", "url")
+
     def __init__(self, text, text_type: TextType, url = None):
         self.text = text
         self.text_type = text_type
@@ -62,11 +66,90 @@ def split_nodes_image(old_nodes: list[TextNode]):
 def split_nodes_link(old_nodes: list[TextNode]):
     return __split_nodes(old_nodes, extract_markdown_links, TextType.LINK, (1,1)) # 1 = len("[", 1 = len(")")
 
+# same as LINK_PATTERN without the lookbehind, which keeps the regex on its fast literal prefix scan
+BRACKETS_PATTERN = re.compile(r"\[(.*?)\]\((.*?)\)")
+# a link or an image in one scan
+INLINE_PATTERN = re.compile(r"(!?)\[(.*?)\]\((.*?)\)")
+
+def __append_images(nodes, text, text_type):
+    start = 0
+    if "![" in text:
+        for match in IMAGE_PATTERN.finditer(text):
+            if match.start() > start:
+                nodes.append(TextNode(text[start:match.start()], text_type))
+            nodes.append(TextNode(match[1], TextType.IMAGE, match[2]))
+            start = match.end()
+    if start < len(text):
+        nodes.append(TextNode(text[start:], text_type))
+
+def __append_links_then_images(nodes, text, text_type):
+    start = 0
+    search_from = 0
+    while True:
+        match = BRACKETS_PATTERN.search(text, search_from)
+        if match == None:
+            break
+        if match.start() > 0 and text[match.start()-1] == "!":
+            search_from = match.start() + 1
+            continue
+        __append_images(nodes, text[start:match.start()], text_type)
+        nodes.append(TextNode(match[1], TextType.LINK, match[2]))
+        start = search_from = match.end()
+    __append_images(nodes, text[start:], text_type)
+
+def __append_segment(nodes, text, text_type):
+    # split_nodes_link runs before split_nodes_image, so links win over images they overlap.
+    # The combined scan agrees with that unless an image swallowed another "[", which is rare
+    # enough to hand the whole segment to the exact links-then-images path.
+    if "[" not in text:
+        nodes.append(TextNode(text, text_type))
+        return
+    mark = len(nodes)
+    start = 0
+    for match in INLINE_PATTERN.finditer(text):
+        if match[1] and "[" in match[0][2:]:
+            del nodes[mark:]
+            __append_links_then_images(nodes, text, text_type)
+            return
+        if match.start() > start:
+            nodes.append(TextNode(text[start:match.start()], text_type))
+        nodes.append(TextNode(match[2], TextType.IMAGE if match[1] else TextType.LINK, match[3]))
+        start = match.end()
+    if start < len(text):
+        nodes.append(TextNode(text[start:], text_type))
+
+# Single left to right pass equivalent to splitting on "**", then "_", then "`", then links and images.
+# Each split restarts its open/closed parity inside every node produced by the splits before it,
+# so "**" resets the italic and code state and "_" resets the code state.
 def text_to_textnodes(text):
-    nodes = [TextNode(text, TextType.TEXT)]
-    nodes = split_nodes_delimiter(nodes, "**", TextType.BOLD)
-    nodes = split_nodes_delimiter(nodes, "_", TextType.ITALIC)
-    nodes = split_nodes_delimiter(nodes, "`", TextType.CODE)
-    nodes = split_nodes_link(nodes)
-    nodes = split_nodes_image(nodes)
-    return nodes
\ No newline at end of file
+    nodes = []
+    bold = italic = code = False
+    text_type = TextType.TEXT
+    start = 0
+    end = len(text)
+    # str.find keeps the scan in C, a missing delimiter is parked at the end of the text
+    next_bold = text.find("**") % (end + 1)
+    next_italic = text.find("_") % (end + 1)
+    next_code = text.find("`") % (end + 1)
+    while True:
+        index = min(next_bold, next_italic, next_code)
+        if index == end:
+            break
+        if index > start:
+            __append_segment(nodes, text[start:index], text_type)
+        if index == next_bold:
+            bold, italic, code = not bold, False, False
+            start = index + 2
+            next_bold = text.find("**", start) % (end + 1)
+        elif index == next_italic:
+            italic, code = not italic, False
+            start = index + 1
+            next_italic = text.find("_", start) % (end + 1)
+        else:
+            code = not code
+            start = index + 1
+            next_code = text.find("`", start) % (end + 1)
+        text_type = TextType.CODE if code else TextType.ITALIC if italic else TextType.BOLD if bold else TextType.TEXT
+    if start < end:
+        __append_segment(nodes, text[start:], text_type)
+    return nodes
@@ -0,0 +1,50 @@
+import os, time
+
+# path -> (mtime_ns, size) for every file under the given files and directories
+def snapshot(paths):
+    files = {}
+    for path in paths:
+        if os.path.isfile(path):
+            stat = os.stat(path)
+            files[path] = (stat.st_mtime_ns, stat.st_size)
+            continue
+        for dir_path, _, file_names in os.walk(path):
+            for file_name in file_names:
+                file_path = os.path.join(dir_path, file_name)
+                try:
+                    stat = os.stat(file_path)
+                except FileNotFoundError:
+                    # deleted between the listing and the stat, the next poll picks it up
+                    continue
+                files[file_path] = (stat.st_mtime_ns, stat.st_size)
+    return files
+
+def changed_paths(old, new):
+    changed = sorted(path for path, stat in new.items() if old.get(path) != stat)
+    removed = sorted(path for path in old if path not in new)
+    return changed, removed
+
+def watch(paths, on_change, interval = 0.5, debounce = 0.2):
+    print(f"Watching {', '.join(paths)} for changes")
+    current = snapshot(paths)
+    while True:
+        time.sleep(interval)
+        latest = snapshot(paths)
+        if latest == current:
+            continue
+        # let a burst of writes (editor saves, git checkouts) settle into a single rebuild
+        while True:
+            time.sleep(debounce)
+            settled = snapshot(paths)
+            if settled == latest:
+                break
+            latest = settled
+        changed, removed = changed_paths(current, latest)
+        current = latest
+        start = time.perf_counter()
+        try:
+            on_change(changed, removed)
+        except Exception as e:
+            print(f"Rebuild failed: {e}")
+            continue
+        print(f"Rebuilt {len(changed) + len(removed)} change(s) in {(time.perf_counter() - start) * 1000:.1f} ms")
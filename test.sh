@@ -1 +1 @@
-python3 -m unittest discover -s src
\ No newline at end of file
+python3 -m unittest discover -s src -t .
\ No newline at end of file